@@ -1,10 +1,18 @@
-from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
+import asyncio
+import html
+import logging
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from telegram import Bot, Update
+from telegram.error import BadRequest, Forbidden, TelegramError
 from telegram.ext import (
     Application,
     CallbackQueryHandler,
     ContextTypes,
     ConversationHandler,
     MessageHandler,
+    TypeHandler,
     filters,
 )
 
@@ -20,9 +28,19 @@ from src.bot.keyboards import (
     get_back_keyboard,
     get_cancel_keyboard,
     get_edit_confirm_keyboard,
+    get_pagination_keyboard,
 )
+from src.bot.templates import (
+    READINGS_REMINDER_TEXT,
+    render_invoice_notification,
+    render_payment_reminder,
+)
+from src.bot.utils import edit_if_changed, parse_number, reply_or_edit
+from src.services.broadcast import BLOCKED_CHATS_KEY, broadcast_service
 from src.services.sheets import sheets_service
 
+logger = logging.getLogger(__name__)
+
 # Conversation states
 ADDING_PREMISE_NAME = 1
 ADDING_PREMISE_ADDRESS = 2
@@ -35,22 +53,37 @@ SELECTING_METER_RESPONSIBLE_PAYMENT = 8
 CONFIRMING_METER = 9
 EDITING_TARIFF = 10
 
+# Abandoned management conversations are dropped after this many seconds
+CONVERSATION_TIMEOUT = 600
+
+# Static menu texts
+OWNER_GREETING_TMPL = (
+    "👋 Здравствуйте, {name}!\n\n"
+    "🏠 Вы вошли как владелец.\n\n"
+    "Выберите нужный раздел:"
+)
+OWNER_REMINDERS_TEXT = "🔔 *Напоминания*\n\nВыберите тип напоминания:"
+OWNER_MANAGEMENT_TEXT = "⚙️ *Управление*\n\nВыберите действие:"
+EMPTY_METERS_STATUS_TEXT = "📊 Нет счётчиков в системе."
+EMPTY_UNPAID_TEXT = "✨ Нет неоплаченных счетов! Все арендаторы оплатили."
+EMPTY_DRAFTS_TEXT = (
+    "📨 Нет черновиков счетов для выставления.\n\n"
+    "ℹ️ Убедитесь, что в таблице есть записи со статусом «Черновик» и суммой > 0."
+)
+
 
 # === Owner menu navigation ===
 
 async def owner_back_main_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Return to owner main menu."""
     query = update.callback_query
-    await query.answer()
-
     user = update.effective_user
-    tenant = await sheets_service.get_tenant(user.id)
+    _, tenant = await asyncio.gather(query.answer(), sheets_service.get_tenant(user.id))
     name = tenant.get("Имя", "") if tenant else ""
 
-    await query.edit_message_text(
-        f"👋 Здравствуйте, {name}!\n\n"
-        "🏠 Вы вошли как владелец.\n\n"
-        "Выберите нужный раздел:",
+    await edit_if_changed(
+        query,
+        OWNER_GREETING_TMPL.format(name=name),
         reply_markup=get_owner_main_menu()
     )
 
@@ -63,80 +96,62 @@ READINGS_STATUS_PAGE_SIZE = 10
 async def owner_readings_status_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Show readings status for all meters (first page)."""
     query = update.callback_query
-    await query.answer()
+    await asyncio.gather(query.answer(), show_readings_status_page(update, context, page=0))
+
 
-    await show_readings_status_page(query, context, page=0)
+async def readings_status_refresh_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Re-fetch readings status and show the first page."""
+    query = update.callback_query
+    await query.answer("🔄 Обновлено")
+
+    sheets_service.invalidate_cache("readings")
+    await show_readings_status_page(update, context, page=0)
 
 
 async def readings_status_page_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Show readings status for a specific page."""
     query = update.callback_query
-    await query.answer()
+    # Page number captured from callback_data: readings_status_page_N
+    page = int(context.match.group(1))
+    await asyncio.gather(query.answer(), show_readings_status_page(update, context, page))
 
-    # Extract page number from callback_data: readings_status_page_N
-    page = int(query.data.split("_")[-1])
-    await show_readings_status_page(query, context, page)
 
+async def show_readings_status_page(update: Update, context: ContextTypes.DEFAULT_TYPE, page: int) -> None:
+    """Display a specific page of readings status (message or callback)."""
+    total, submitted, page_items = await sheets_service.get_readings_status_page(
+        max(0, page) * READINGS_STATUS_PAGE_SIZE, READINGS_STATUS_PAGE_SIZE
+    )
 
-async def show_readings_status_page(query, context: ContextTypes.DEFAULT_TYPE, page: int) -> None:
-    """Display a specific page of readings status."""
-    status_list = await sheets_service.get_readings_status()
-
-    if not status_list:
-        await query.edit_message_text(
-            "📊 Нет счётчиков в системе.",
+    if not total:
+        await reply_or_edit(
+            update,
+            EMPTY_METERS_STATUS_TEXT,
             reply_markup=get_back_keyboard("owner_back_main")
         )
         return
 
-    total = len(status_list)
-    submitted = sum(1 for item in status_list if item["has_readings"])
-
-    # Pagination
+    # Pagination (the service clamps the offset the same way)
     total_pages = (total + READINGS_STATUS_PAGE_SIZE - 1) // READINGS_STATUS_PAGE_SIZE
     page = max(0, min(page, total_pages - 1))
 
-    start_idx = page * READINGS_STATUS_PAGE_SIZE
-    end_idx = min(start_idx + READINGS_STATUS_PAGE_SIZE, total)
-    page_items = status_list[start_idx:end_idx]
-
-    lines = [f"📊 *Статус показаний за текущий месяц:*\n"]
-
-    for item in page_items:
-        meter = item["meter"]
-        name = meter.get("Название", "")
-        premise = meter.get("Помещение", "")
-        responsible = meter.get("Имя_показания", "")
-
-        if item["has_readings"]:
-            emoji = "✅"
-        else:
-            emoji = "⏳"
-
-        lines.append(f"{emoji} {name} ({premise}) — {responsible}")
-
-    lines.append(f"\n📈 *Сдано: {submitted} из {total}*")
-
+    rows = "\n".join(
+        f"{'✅' if item['has_readings'] else '⏳'} {item['meter'].get('Название', '')} "
+        f"({item['meter'].get('Помещение', '')}) — {item['meter'].get('Имя_показания', '')}"
+        for item in page_items
+    )
+    text = f"📊 *Статус показаний за текущий месяц:*\n\n{rows}\n\n📈 *Сдано: {submitted} из {total}*"
     if total_pages > 1:
-        lines.append(f"📄 Страница {page + 1} из {total_pages}")
-
-    # Build pagination keyboard
-    buttons = []
-    nav_row = []
+        text += f"\n📄 Страница {page + 1} из {total_pages}"
 
-    if page > 0:
-        nav_row.append(InlineKeyboardButton("« Назад", callback_data=f"readings_status_page_{page - 1}"))
-    if page < total_pages - 1:
-        nav_row.append(InlineKeyboardButton("Вперёд »", callback_data=f"readings_status_page_{page + 1}"))
-
-    if nav_row:
-        buttons.append(nav_row)
-
-    buttons.append([InlineKeyboardButton("« В меню", callback_data="owner_back_main")])
+    keyboard = get_pagination_keyboard(
+        "readings_status_page_", page, total_pages, "« В меню", "owner_back_main",
+        refresh_data="readings_status_refresh",
+    )
 
-    await query.edit_message_text(
-        "\n".join(lines),
-        reply_markup=InlineKeyboardMarkup(buttons),
+    await reply_or_edit(
+        update,
+        text,
+        reply_markup=keyboard,
         parse_mode="Markdown"
     )
 
@@ -146,13 +161,17 @@ async def show_readings_status_page(query, context: ContextTypes.DEFAULT_TYPE, p
 async def owner_unpaid_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Show all unpaid invoices."""
     query = update.callback_query
-    await query.answer()
+    await asyncio.gather(query.answer(), show_unpaid_invoices(update))
 
+
+async def show_unpaid_invoices(update: Update) -> None:
+    """Display all unpaid invoices (message or callback)."""
     invoices = await sheets_service.get_all_unpaid_invoices()
 
     if not invoices:
-        await query.edit_message_text(
-            "✨ Нет неоплаченных счетов! Все арендаторы оплатили.",
+        await reply_or_edit(
+            update,
+            EMPTY_UNPAID_TEXT,
             reply_markup=get_back_keyboard("owner_back_main")
         )
         return
@@ -170,7 +189,8 @@ async def owner_unpaid_callback(update: Update, context: ContextTypes.DEFAULT_TY
 
     lines.append(f"\n💵 *Итого: {total:.0f} руб.*")
 
-    await query.edit_message_text(
+    await reply_or_edit(
+        update,
         "\n".join(lines),
         reply_markup=get_back_keyboard("owner_back_main"),
         parse_mode="Markdown"
@@ -182,14 +202,17 @@ async def owner_unpaid_callback(update: Update, context: ContextTypes.DEFAULT_TY
 async def owner_issue_invoice_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Show draft invoices to issue."""
     query = update.callback_query
-    await query.answer()
+    await asyncio.gather(query.answer(), show_draft_invoices(update))
+
 
+async def show_draft_invoices(update: Update) -> None:
+    """Display draft invoices ready to be issued (message or callback)."""
     invoices = await sheets_service.get_draft_invoices()
 
     if not invoices:
-        await query.edit_message_text(
-            "📨 Нет черновиков счетов для выставления.\n\n"
-            "ℹ️ Убедитесь, что в таблице есть записи со статусом «Черновик» и суммой > 0.",
+        await reply_or_edit(
+            update,
+            EMPTY_DRAFTS_TEXT,
             reply_markup=get_back_keyboard("owner_back_main")
         )
         return
@@ -207,7 +230,8 @@ async def owner_issue_invoice_callback(update: Update, context: ContextTypes.DEF
     lines.append(f"\n💰 *Всего: {total:.0f} руб.*")
     lines.append("\nВыберите счёт для выставления:")
 
-    await query.edit_message_text(
+    await reply_or_edit(
+        update,
         "\n".join(lines),
         reply_markup=get_draft_invoices_keyboard(invoices),
         parse_mode="Markdown"
@@ -217,15 +241,19 @@ async def owner_issue_invoice_callback(update: Update, context: ContextTypes.DEF
 async def issue_invoice_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Issue specific invoice (change status from 'Черновик' to 'Не оплачен')."""
     query = update.callback_query
-    await query.answer()
 
-    # Extract premise_id from callback_data: "issue_invoice_123"
-    premise_id = int(query.data.split("_")[2])
+    # premise_id captured from callback_data: "issue_invoice_123"
+    premise_id = int(context.match.group(1))
 
-    # Get invoice info before issuing
-    invoice = await sheets_service.get_invoice_for_premise(premise_id)
+    # Read-only lookups before issuing, overlapped with the callback ack
+    _, invoice, payment_details = await asyncio.gather(
+        query.answer(),
+        sheets_service.get_invoice_for_premise(premise_id),
+        sheets_service.get_payment_details(),
+    )
     if not invoice:
-        await query.edit_message_text(
+        await edit_if_changed(
+            query,
             "❌ Счёт не найден.",
             reply_markup=get_back_keyboard("owner_back_main")
         )
@@ -236,11 +264,18 @@ async def issue_invoice_callback(update: Update, context: ContextTypes.DEFAULT_T
     responsible_id = invoice.get("ответственный_оплата")
     responsible_name = invoice.get("Имя_оплата", "")
 
-    # Issue the invoice
-    success = await sheets_service.issue_invoice(premise_id)
+    # Issue the invoice; the payer's meters (another sheet) are read meanwhile
+    if responsible_id:
+        success, meters = await asyncio.gather(
+            sheets_service.issue_invoice(premise_id),
+            sheets_service.get_meters_by_premise_and_responsible(premise_id, responsible_id),
+        )
+    else:
+        success = await sheets_service.issue_invoice(premise_id)
 
     if success:
-        await query.edit_message_text(
+        await edit_if_changed(
+            query,
             f"✅ *Счёт успешно выставлен!*\n\n"
             f"🏠 Помещение: {premise_name}\n"
             f"💰 Сумма: *{amount:.0f} руб.*\n"
@@ -252,42 +287,16 @@ async def issue_invoice_callback(update: Update, context: ContextTypes.DEFAULT_T
 
         # Notify tenant about the invoice
         if responsible_id:
-            payment_details = await sheets_service.get_payment_details()
-
-            # Get meters breakdown for this user
-            meters = await sheets_service.get_meters_by_premise(premise_id)
-            breakdown_lines = []
-            for meter in meters:
-                if str(meter.get("ответственный_оплата")) != str(responsible_id):
-                    continue
-                meter_name = meter.get("Название", "")
-                consumption = meter.get("Расход к оплате", 0) or 0
-                unit = meter.get("Единица", "")
-                tariff = meter.get("Тариф", 0) or 0
-                if consumption > 0:
-                    breakdown_lines.append(f"   📟 {meter_name}: {consumption:.2f} {unit} × {tariff:.2f} руб.")
-
-            breakdown = "\n".join(breakdown_lines) if breakdown_lines else ""
-            breakdown_section = f"\n📊 *Детализация:*\n{breakdown}\n" if breakdown else ""
-
+            text = render_invoice_notification(premise_name, amount, meters, payment_details)
             try:
-                await context.bot.send_message(
-                    chat_id=responsible_id,
-                    text=(
-                        f"📨 *Вам выставлен счёт на оплату!*\n\n"
-                        f"🏠 Помещение: {premise_name}\n"
-                        f"💰 Сумма: *{amount:.0f} руб.*\n"
-                        f"{breakdown_section}\n"
-                        f"🏦 *Реквизиты для оплаты:*\n`{payment_details}`\n\n"
-                        "📸 После оплаты, пожалуйста, отправьте фото чека через бот.\n\n"
-                        "Нажмите кнопку «💳 Мои счета» в меню."
-                    ),
-                    parse_mode="Markdown"
-                )
-            except Exception:
-                pass  # Tenant might have blocked the bot
+                await context.bot.send_message(chat_id=responsible_id, text=text, parse_mode="Markdown")
+            except Forbidden:
+                logger.info("Tenant %s blocked the bot, invoice notification skipped", responsible_id)
+            except TelegramError:
+                logger.warning("Failed to notify tenant %s about invoice", responsible_id, exc_info=True)
     else:
-        await query.edit_message_text(
+        await edit_if_changed(
+            query,
             "❌ Не удалось выставить счёт. Попробуйте позже.",
             reply_markup=get_back_keyboard("owner_back_main")
         )
@@ -300,9 +309,9 @@ async def owner_reminders_callback(update: Update, context: ContextTypes.DEFAULT
     query = update.callback_query
     await query.answer()
 
-    await query.edit_message_text(
-        "🔔 *Напоминания*\n\n"
-        "Выберите тип напоминания:",
+    await edit_if_changed(
+        query,
+        OWNER_REMINDERS_TEXT,
         reply_markup=get_owner_reminders_menu(),
         parse_mode="Markdown"
     )
@@ -316,13 +325,15 @@ async def remind_readings_callback(update: Update, context: ContextTypes.DEFAULT
     tenants = await sheets_service.get_tenants_without_readings()
 
     if not tenants:
-        await query.edit_message_text(
+        await edit_if_changed(
+            query,
             "✨ Все арендаторы сдали показания в этом месяце!",
             reply_markup=get_back_keyboard("owner_reminders")
         )
         return
 
-    await query.edit_message_text(
+    await edit_if_changed(
+        query,
         f"📊 *Не сдали показания ({len(tenants)} чел.):*\n\n"
         "Выберите, кому отправить напоминание:",
         reply_markup=get_tenants_to_remind_keyboard(tenants, "readings"),
@@ -338,13 +349,15 @@ async def remind_payments_callback(update: Update, context: ContextTypes.DEFAULT
     tenants = await sheets_service.get_tenants_with_unpaid()
 
     if not tenants:
-        await query.edit_message_text(
+        await edit_if_changed(
+            query,
             "✨ Нет неоплаченных счетов!",
             reply_markup=get_back_keyboard("owner_reminders")
         )
         return
 
-    await query.edit_message_text(
+    await edit_if_changed(
+        query,
         f"💳 *Не оплатили ({len(tenants)} чел.):*\n\n"
         "Выберите, кому отправить напоминание:",
         reply_markup=get_tenants_to_remind_keyboard(tenants, "payment"),
@@ -357,10 +370,9 @@ async def send_reminder_callback(update: Update, context: ContextTypes.DEFAULT_T
     query = update.callback_query
     await query.answer()
 
-    # Parse callback: "remind_readings_123456" or "remind_payment_all"
-    parts = query.data.split("_")
-    remind_type = parts[1]  # "readings" or "payment"
-    target = parts[2]  # telegram_id or "all"
+    # Parsed from callback: "remind_readings_123456" or "remind_payment_all"
+    remind_type = context.match.group(1)  # "readings" or "payment"
+    target = context.match.group(2)  # telegram_id or "all"
 
     if target == "all":
         await send_reminder_to_all(update, context, remind_type)
@@ -368,6 +380,42 @@ async def send_reminder_callback(update: Update, context: ContextTypes.DEFAULT_T
         await send_reminder_to_one(update, context, remind_type, int(target))
 
 
+async def _build_readings_reminders(tenant_id: Optional[int] = None) -> List[Tuple[int, str]]:
+    """Readings reminders for one tenant, or for everyone without readings."""
+    if tenant_id is not None:
+        return [(tenant_id, READINGS_REMINDER_TEXT)]
+
+    tenants = await sheets_service.get_tenants_without_readings()
+    return [(tenant["telegram_id"], READINGS_REMINDER_TEXT) for tenant in tenants]
+
+
+async def _build_payment_reminders(tenant_id: Optional[int] = None) -> List[Tuple[int, str]]:
+    """Payment reminders for one tenant, or for everyone with unpaid invoices."""
+    if tenant_id is not None:
+        invoices, payment_details = await asyncio.gather(
+            sheets_service.get_unpaid_invoices_for_tenant(tenant_id),
+            sheets_service.get_payment_details(),
+        )
+        total = sum(inv["Сумма"] for inv in invoices)
+        return [(tenant_id, render_payment_reminder(total, payment_details))]
+
+    tenants, payment_details = await asyncio.gather(
+        sheets_service.get_tenants_with_unpaid(),
+        sheets_service.get_payment_details(),
+    )
+    return [
+        (tenant["telegram_id"], render_payment_reminder(tenant.get("total", 0), payment_details))
+        for tenant in tenants
+    ]
+
+
+# remind_type -> builder of (chat_id, text) reminder messages
+REMINDER_BUILDERS = {
+    "readings": _build_readings_reminders,
+    "payment": _build_payment_reminders,
+}
+
+
 async def send_reminder_to_one(
     update: Update,
     context: ContextTypes.DEFAULT_TYPE,
@@ -376,45 +424,37 @@ async def send_reminder_to_one(
 ) -> None:
     """Send reminder to one tenant."""
     query = update.callback_query
-
-    if remind_type == "readings":
-        message = (
-            "📊 *Напоминание о показаниях*\n\n"
-            "Пожалуйста, не забудьте сдать показания счётчиков.\n\n"
-            "Нажмите кнопку «📊 Сдать показания» в меню бота."
-        )
-    else:
-        # Payment reminder
-        invoices = await sheets_service.get_unpaid_invoices_for_tenant(tenant_id)
-        total = sum(inv.get("Сумма", 0) or 0 for inv in invoices)
-        payment_details = await sheets_service.get_payment_details()
-
-        message = (
-            f"💳 *Напоминание об оплате*\n\n"
-            f"💰 К оплате: *{total:.0f} руб.*\n\n"
-            f"🏦 *Реквизиты:*\n`{payment_details}`\n\n"
-            "📸 После оплаты, пожалуйста, отправьте фото чека через бот."
-        )
+    [(_, message)] = await REMINDER_BUILDERS[remind_type](tenant_id)
 
     try:
-        await context.bot.send_message(chat_id=tenant_id, text=message, parse_mode="Markdown")
-        await query.edit_message_text(
-            "✅ Напоминание успешно отправлено!",
-            reply_markup=get_back_keyboard("owner_reminders")
-        )
-    except Exception as e:
-        error_str = str(e).lower()
-        if "chat not found" in error_str or "bot was blocked" in error_str:
-            error_msg = "Пользователь не запустил бота или заблокировал его."
-        elif "user is deactivated" in error_str:
+        await broadcast_service.send(context.bot, tenant_id, message, parse_mode="HTML")
+    except Forbidden as e:
+        # "bot was blocked by the user" or "user is deactivated"
+        if "deactivated" in e.message:
             error_msg = "Аккаунт пользователя удалён."
         else:
-            error_msg = str(e)
-
-        await query.edit_message_text(
-            f"❌ Не удалось отправить напоминание.\n\n{error_msg}",
+            error_msg = "Пользователь не запустил бота или заблокировал его."
+            context.bot_data.setdefault(BLOCKED_CHATS_KEY, set()).add(tenant_id)
+    except BadRequest as e:
+        if "chat not found" in e.message.lower():
+            error_msg = "Пользователь не запустил бота или заблокировал его."
+        else:
+            error_msg = e.message
+    except TelegramError as e:
+        error_msg = e.message
+    else:
+        await edit_if_changed(
+            query,
+            "✅ Напоминание успешно отправлено!",
             reply_markup=get_back_keyboard("owner_reminders")
         )
+        return
+
+    await edit_if_changed(
+        query,
+        f"❌ Не удалось отправить напоминание.\n\n{error_msg}",
+        reply_markup=get_back_keyboard("owner_reminders")
+    )
 
 
 async def send_reminder_to_all(
@@ -422,61 +462,48 @@ async def send_reminder_to_all(
     context: ContextTypes.DEFAULT_TYPE,
     remind_type: str
 ) -> None:
-    """Send reminders to all relevant tenants."""
+    """Start sending reminders to all relevant tenants in the background."""
     query = update.callback_query
 
-    sent = 0
-    failed = 0
+    messages = await REMINDER_BUILDERS[remind_type]()
+    await edit_if_changed(
+        query,
+        f"📤 *Рассылка запущена*\n\n"
+        f"👥 Получателей: {len(messages)}\n"
+        f"Итоги придут отдельным сообщением.",
+        reply_markup=get_back_keyboard("owner_reminders"),
+        parse_mode="Markdown"
+    )
 
-    if remind_type == "readings":
-        tenants = await sheets_service.get_tenants_without_readings()
-        message = (
-            "📊 *Напоминание о показаниях*\n\n"
-            "Пожалуйста, не забудьте сдать показания счётчиков.\n\n"
-            "Нажмите кнопку «📊 Сдать показания» в меню бота."
+    # Owner's UI is free while the fan-out runs; PTB keeps a reference to the task
+    context.application.create_task(
+        _run_broadcast(
+            context.bot,
+            query.message.chat_id,
+            messages,
+            context.bot_data.setdefault(BLOCKED_CHATS_KEY, set()),
         )
+    )
 
-        for tenant in tenants:
-            try:
-                await context.bot.send_message(
-                    chat_id=tenant["telegram_id"],
-                    text=message,
-                    parse_mode="Markdown"
-                )
-                sent += 1
-            except Exception:
-                failed += 1
-    else:
-        # Payment reminders
-        tenants = await sheets_service.get_tenants_with_unpaid()
-        payment_details = await sheets_service.get_payment_details()
-
-        for tenant in tenants:
-            total = tenant.get("total", 0)
-            message = (
-                f"💳 *Напоминание об оплате*\n\n"
-                f"💰 К оплате: *{total:.0f} руб.*\n\n"
-                f"🏦 *Реквизиты:*\n`{payment_details}`\n\n"
-                "📸 После оплаты, пожалуйста, отправьте фото чека через бот."
-            )
 
-            try:
-                await context.bot.send_message(
-                    chat_id=tenant["telegram_id"],
-                    text=message,
-                    parse_mode="Markdown"
-                )
-                sent += 1
-            except Exception:
-                failed += 1
-
-    await query.edit_message_text(
-        f"📤 *Рассылка завершена*\n\n"
-        f"✅ Отправлено: {sent}\n"
-        f"❌ Ошибок: {failed}",
-        reply_markup=get_back_keyboard("owner_reminders"),
-        parse_mode="Markdown"
-    )
+async def _run_broadcast(
+    bot: Bot, report_chat_id: int, messages: List[Tuple[int, str]], blocked: Set[int]
+) -> None:
+    """Send reminders and report the totals to the owner."""
+    sent, failed = await broadcast_service.send_all(bot, messages, parse_mode="HTML", blocked=blocked)
+
+    try:
+        await bot.send_message(
+            chat_id=report_chat_id,
+            text=(
+                f"📤 *Рассылка завершена*\n\n"
+                f"✅ Отправлено: {sent}\n"
+                f"❌ Ошибок: {failed}"
+            ),
+            parse_mode="Markdown"
+        )
+    except TelegramError:
+        logger.warning("Failed to report broadcast result to %s", report_chat_id, exc_info=True)
 
 
 # === Management ===
@@ -486,9 +513,9 @@ async def owner_management_callback(update: Update, context: ContextTypes.DEFAUL
     query = update.callback_query
     await query.answer()
 
-    await query.edit_message_text(
-        "⚙️ *Управление*\n\n"
-        "Выберите действие:",
+    await edit_if_changed(
+        query,
+        OWNER_MANAGEMENT_TEXT,
         reply_markup=get_owner_management_menu(),
         parse_mode="Markdown"
     )
@@ -496,12 +523,24 @@ async def owner_management_callback(update: Update, context: ContextTypes.DEFAUL
 
 # --- Add premise ---
 
+@dataclass(slots=True)
+class PremiseDraft:
+    """Premise being entered in the add-premise conversation."""
+    name: str = ""
+    address: str = ""
+
+
+def _premise_draft(context: ContextTypes.DEFAULT_TYPE) -> PremiseDraft:
+    return context.user_data.setdefault("premise_draft", PremiseDraft())
+
+
 async def mgmt_add_premise_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Start adding a new premise."""
     query = update.callback_query
     await query.answer()
 
-    await query.edit_message_text(
+    await edit_if_changed(
+        query,
         "🏠 *Добавление помещения*\n\n"
         "📝 Введите название помещения\n"
         "(например: «Офис 1» или «Склад»):",
@@ -524,7 +563,7 @@ async def receive_premise_name(update: Update, context: ContextTypes.DEFAULT_TYP
         )
         return ADDING_PREMISE_NAME
 
-    context.user_data["premise_name"] = name
+    _premise_draft(context).name = name
 
     await update.message.reply_text(
         f"✅ Название: *{name}*\n\n"
@@ -543,8 +582,9 @@ async def receive_premise_address(update: Update, context: ContextTypes.DEFAULT_
     if address == "-":
         address = ""
 
-    context.user_data["premise_address"] = address
-    name = context.user_data.get("premise_name", "")
+    draft = _premise_draft(context)
+    draft.address = address
+    name = draft.name
 
     await update.message.reply_text(
         f"📋 *Проверьте данные:*\n\n"
@@ -561,14 +601,19 @@ async def receive_premise_address(update: Update, context: ContextTypes.DEFAULT_
 async def confirm_premise_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Confirm and save premise."""
     query = update.callback_query
+    # Take the draft before any await, so a double tap (updates run
+    # concurrently) finds it gone instead of adding the premise twice
+    draft = context.user_data.pop("premise_draft", None)
     await query.answer()
+    if draft is None:
+        return ConversationHandler.END
 
-    name = context.user_data.get("premise_name", "")
-    address = context.user_data.get("premise_address", "")
+    name, address = draft.name, draft.address
 
     premise_id = await sheets_service.add_premise(name, address)
 
-    await query.edit_message_text(
+    await edit_if_changed(
+        query,
         f"✅ *Помещение успешно добавлено!*\n\n"
         f"🆔 ID: {premise_id}\n"
         f"🏠 Название: *{name}*\n"
@@ -582,21 +627,29 @@ async def confirm_premise_callback(update: Update, context: ContextTypes.DEFAULT
 
 
 async def edit_premise_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
-    """Go back to edit premise."""
-    query = update.callback_query
-    await query.answer()
+    """Go back to edit premise - restart from name input."""
+    context.user_data.clear()
+    return await mgmt_add_premise_callback(update, context)
 
-    await query.edit_message_text(
-        "🏠 *Добавление помещения*\n\n"
-        "📝 Введите название помещения:",
-        reply_markup=get_cancel_keyboard(),
-        parse_mode="Markdown"
-    )
 
-    return ADDING_PREMISE_NAME
+# --- Add meter ---
 
+@dataclass(slots=True)
+class MeterDraft:
+    """Meter being entered in the add-meter conversation."""
+    premise: Dict = field(default_factory=dict)
+    name: str = ""
+    type: str = ""
+    unit: str = ""
+    responsible_readings_id: int = 0
+    responsible_readings_name: str = ""
+    responsible_payment_id: int = 0
+    responsible_payment_name: str = ""
+
+
+def _meter_draft(context: ContextTypes.DEFAULT_TYPE) -> MeterDraft:
+    return context.user_data.setdefault("meter_draft", MeterDraft())
 
-# --- Add meter ---
 
 async def mgmt_add_meter_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Start adding a new meter - select premise."""
@@ -606,13 +659,15 @@ async def mgmt_add_meter_callback(update: Update, context: ContextTypes.DEFAULT_
     premises = await sheets_service.get_all_premises()
 
     if not premises:
-        await query.edit_message_text(
+        await edit_if_changed(
+            query,
             "⚠️ Сначала добавьте хотя бы одно помещение.",
             reply_markup=get_back_keyboard("owner_management")
         )
         return ConversationHandler.END
 
-    await query.edit_message_text(
+    await edit_if_changed(
+        query,
         "📟 *Добавление счётчика*\n\n"
         "🏠 Выберите помещение:",
         reply_markup=get_premises_keyboard(premises, callback_prefix="meter_premise"),
@@ -627,16 +682,17 @@ async def meter_premise_selected_callback(update: Update, context: ContextTypes.
     query = update.callback_query
     await query.answer()
 
-    premise_id = int(query.data.split("_")[2])
+    premise_id = int(context.match.group(1))
     premise = await sheets_service.get_premise(premise_id)
 
     if not premise:
-        await query.edit_message_text("❌ Помещение не найдено.")
+        await edit_if_changed(query, "❌ Помещение не найдено.")
         return ConversationHandler.END
 
-    context.user_data["meter_premise"] = premise
+    context.user_data["meter_draft"] = MeterDraft(premise=premise)
 
-    await query.edit_message_text(
+    await edit_if_changed(
+        query,
         f"📟 *Добавление счётчика*\n\n"
         f"🏠 Помещение: *{premise.get('Название', '')}*\n\n"
         "📝 Введите название счётчика\n"
@@ -660,7 +716,7 @@ async def receive_meter_name(update: Update, context: ContextTypes.DEFAULT_TYPE)
         )
         return ADDING_METER_NAME
 
-    context.user_data["meter_name"] = name
+    _meter_draft(context).name = name
 
     await update.message.reply_text(
         f"✅ Название: *{name}*\n\n"
@@ -676,7 +732,7 @@ async def receive_meter_name(update: Update, context: ContextTypes.DEFAULT_TYPE)
 async def receive_meter_type(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Process meter type."""
     meter_type = update.message.text.strip()
-    context.user_data["meter_type"] = meter_type
+    _meter_draft(context).type = meter_type
 
     await update.message.reply_text(
         f"✅ Тип: *{meter_type}*\n\n"
@@ -692,7 +748,7 @@ async def receive_meter_type(update: Update, context: ContextTypes.DEFAULT_TYPE)
 async def receive_meter_unit(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Process meter unit and select responsible for readings."""
     unit = update.message.text.strip()
-    context.user_data["meter_unit"] = unit
+    _meter_draft(context).unit = unit
 
     # Тариф now comes from Настройки sheet via formula - no need to ask user
     # Proceed directly to selecting responsible person for readings
@@ -721,20 +777,22 @@ async def meter_responsible_readings_callback(update: Update, context: ContextTy
     query = update.callback_query
     await query.answer()
 
-    responsible_id = int(query.data.split("_")[3])
+    responsible_id = int(context.match.group(1))
     tenant = await sheets_service.get_tenant(responsible_id)
 
     if not tenant:
-        await query.edit_message_text("❌ Арендатор не найден.")
+        await edit_if_changed(query, "❌ Арендатор не найден.")
         return ConversationHandler.END
 
-    context.user_data["responsible_readings_id"] = responsible_id
-    context.user_data["responsible_readings_name"] = tenant.get("Имя", "")
+    draft = _meter_draft(context)
+    draft.responsible_readings_id = responsible_id
+    draft.responsible_readings_name = tenant.get("Имя", "")
 
     # Now select responsible for payment
     tenants = await sheets_service.get_all_tenants()
 
-    await query.edit_message_text(
+    await edit_if_changed(
+        query,
         f"✅ За показания: *{tenant.get('Имя', '')}*\n\n"
         "👤 Выберите ответственного за *ОПЛАТУ*:",
         reply_markup=get_tenants_keyboard(tenants, callback_prefix="meter_resp_pay"),
@@ -749,25 +807,25 @@ async def meter_responsible_payment_callback(update: Update, context: ContextTyp
     query = update.callback_query
     await query.answer()
 
-    responsible_id = int(query.data.split("_")[3])
+    responsible_id = int(context.match.group(1))
     tenant = await sheets_service.get_tenant(responsible_id)
 
     if not tenant:
-        await query.edit_message_text("❌ Арендатор не найден.")
+        await edit_if_changed(query, "❌ Арендатор не найден.")
         return ConversationHandler.END
 
-    context.user_data["responsible_payment_id"] = responsible_id
-    context.user_data["responsible_payment_name"] = tenant.get("Имя", "")
-
-    premise = context.user_data.get("meter_premise", {})
+    draft = _meter_draft(context)
+    draft.responsible_payment_id = responsible_id
+    draft.responsible_payment_name = tenant.get("Имя", "")
 
-    await query.edit_message_text(
+    await edit_if_changed(
+        query,
         f"📋 *Проверьте данные:*\n\n"
-        f"🏠 Помещение: *{premise.get('Название', '')}*\n"
-        f"📟 Название: *{context.user_data.get('meter_name', '')}*\n"
-        f"📊 Тип: {context.user_data.get('meter_type', '')}\n"
-        f"📏 Единица: {context.user_data.get('meter_unit', '')}\n"
-        f"👤 За показания: {context.user_data.get('responsible_readings_name', '')}\n"
+        f"🏠 Помещение: *{draft.premise.get('Название', '')}*\n"
+        f"📟 Название: *{draft.name}*\n"
+        f"📊 Тип: {draft.type}\n"
+        f"📏 Единица: {draft.unit}\n"
+        f"👤 За показания: {draft.responsible_readings_name}\n"
         f"👤 За оплату: {tenant.get('Имя', '')}\n\n"
         "ℹ️ _Тариф будет взят из листа Настройки._\n\n"
         "Всё верно?",
@@ -781,32 +839,37 @@ async def meter_responsible_payment_callback(update: Update, context: ContextTyp
 async def confirm_meter_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Confirm and save meter."""
     query = update.callback_query
+    # Take the draft before any await, so a double tap doesn't add the meter twice
+    draft = context.user_data.pop("meter_draft", None)
     await query.answer()
+    if draft is None:
+        return ConversationHandler.END
 
-    premise = context.user_data.get("meter_premise", {})
+    premise = draft.premise
 
     # Save meter (tariff is formula-based in Google Sheets, not passed here)
     meter_id = await sheets_service.add_meter(
         premise_id=premise.get("id", 0),
         premise_name=premise.get("Название", ""),
-        name=context.user_data.get("meter_name", ""),
-        meter_type=context.user_data.get("meter_type", ""),
-        unit=context.user_data.get("meter_unit", ""),
-        responsible_readings=context.user_data.get("responsible_readings_id", 0),
-        responsible_readings_name=context.user_data.get("responsible_readings_name", ""),
-        responsible_payment=context.user_data.get("responsible_payment_id", 0),
-        responsible_payment_name=context.user_data.get("responsible_payment_name", ""),
+        name=draft.name,
+        meter_type=draft.type,
+        unit=draft.unit,
+        responsible_readings=draft.responsible_readings_id,
+        responsible_readings_name=draft.responsible_readings_name,
+        responsible_payment=draft.responsible_payment_id,
+        responsible_payment_name=draft.responsible_payment_name,
     )
 
-    await query.edit_message_text(
+    await edit_if_changed(
+        query,
         f"✅ *Счётчик успешно добавлен!*\n\n"
         f"🆔 ID: {meter_id}\n"
         f"🏠 Помещение: *{premise.get('Название', '')}*\n"
-        f"📟 Название: *{context.user_data.get('meter_name', '')}*\n"
-        f"📊 Тип: {context.user_data.get('meter_type', '')}\n"
-        f"📏 Единица: {context.user_data.get('meter_unit', '')}\n"
-        f"👤 За показания: {context.user_data.get('responsible_readings_name', '')}\n"
-        f"👤 За оплату: {context.user_data.get('responsible_payment_name', '')}\n\n"
+        f"📟 Название: *{draft.name}*\n"
+        f"📊 Тип: {draft.type}\n"
+        f"📏 Единица: {draft.unit}\n"
+        f"👤 За показания: {draft.responsible_readings_name}\n"
+        f"👤 За оплату: {draft.responsible_payment_name}\n\n"
         "ℹ️ _Тариф будет подтянут из листа Настройки._",
         reply_markup=get_back_keyboard("owner_management"),
         parse_mode="Markdown"
@@ -818,20 +881,44 @@ async def confirm_meter_callback(update: Update, context: ContextTypes.DEFAULT_T
 
 async def edit_meter_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Go back to edit meter - restart from premise selection."""
-    query = update.callback_query
-    await query.answer()
+    context.user_data.clear()
+    return await mgmt_add_meter_callback(update, context)
 
-    premises = await sheets_service.get_all_premises()
 
-    await query.edit_message_text(
-        "📟 *Добавление счётчика*\n\n"
-        "🏠 Выберите помещение:",
-        reply_markup=get_premises_keyboard(premises, callback_prefix="meter_premise"),
-        parse_mode="Markdown"
-    )
+# --- Paginated lists ---
 
-    context.user_data.clear()
-    return ConversationHandler.END
+# key -> (source list, rendered page texts)
+_rendered_pages: Dict[str, Tuple[List[Dict], List[str]]] = {}
+
+
+def _get_rendered_pages(
+    key: str,
+    items: List[Dict],
+    page_size: int,
+    header: str,
+    fmt_item: Callable[[Dict], str],
+    footer: str,
+) -> List[str]:
+    """Page texts for items, rendered once per version of the cached list.
+
+    sheets_service returns the same list object until its cache entry is
+    refreshed or invalidated, so the list identity serves as the version.
+    """
+    cached = _rendered_pages.get(key)
+    if cached is not None and cached[0] is items:
+        return cached[1]
+
+    total = len(items)
+    total_pages = (total + page_size - 1) // page_size
+    pages = []
+    for start in range(0, total, page_size):
+        lines = [header, *map(fmt_item, items[start:start + page_size])]
+        if total_pages > 1:
+            lines.append(footer.format(page=start // page_size + 1, total_pages=total_pages, total=total))
+        pages.append("\n".join(lines))
+
+    _rendered_pages[key] = (items, pages)
+    return pages
 
 
 # --- List premises ---
@@ -839,6 +926,13 @@ async def edit_meter_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
 PREMISES_PAGE_SIZE = 10
 
 
+def _fmt_premise(p: Dict) -> str:
+    address = html.escape(str(p.get("Адрес", "")))
+    return f"🏠 <b>#{p.get('id', '')}</b> {html.escape(str(p.get('Название', '')))}" + (
+        f"\n   📍 {address}" if address else ""
+    )
+
+
 async def mgmt_list_premises_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Show all premises (first page)."""
     query = update.callback_query
@@ -852,7 +946,7 @@ async def premises_page_callback(update: Update, context: ContextTypes.DEFAULT_T
     query = update.callback_query
     await query.answer()
 
-    page = int(query.data.split("_")[-1])
+    page = int(context.match.group(1))
     await show_premises_page(query, context, page)
 
 
@@ -861,48 +955,27 @@ async def show_premises_page(query, context: ContextTypes.DEFAULT_TYPE, page: in
     premises = await sheets_service.get_all_premises()
 
     if not premises:
-        await query.edit_message_text(
+        await edit_if_changed(
+            query,
             "📋 Нет помещений в системе.",
             reply_markup=get_back_keyboard("owner_management")
         )
         return
 
-    total = len(premises)
-    total_pages = (total + PREMISES_PAGE_SIZE - 1) // PREMISES_PAGE_SIZE
+    pages = _get_rendered_pages(
+        "premises", premises, PREMISES_PAGE_SIZE, "📋 <b>Помещения:</b>\n", _fmt_premise,
+        "\n📄 Страница {page} из {total_pages} (всего: {total})",
+    )
+    total_pages = len(pages)
     page = max(0, min(page, total_pages - 1))
 
-    start_idx = page * PREMISES_PAGE_SIZE
-    end_idx = min(start_idx + PREMISES_PAGE_SIZE, total)
-    page_items = premises[start_idx:end_idx]
-
-    lines = ["📋 *Помещения:*\n"]
-    for p in page_items:
-        pid = p.get("id", "")
-        name = p.get("Название", "")
-        address = p.get("Адрес", "")
-        lines.append(f"🏠 *#{pid}* {name}" + (f"\n   📍 {address}" if address else ""))
-
-    if total_pages > 1:
-        lines.append(f"\n📄 Страница {page + 1} из {total_pages} (всего: {total})")
-
-    # Build pagination keyboard
-    buttons = []
-    nav_row = []
+    keyboard = get_pagination_keyboard("premises_page_", page, total_pages, "« В управление", "owner_management")
 
-    if page > 0:
-        nav_row.append(InlineKeyboardButton("« Назад", callback_data=f"premises_page_{page - 1}"))
-    if page < total_pages - 1:
-        nav_row.append(InlineKeyboardButton("Вперёд »", callback_data=f"premises_page_{page + 1}"))
-
-    if nav_row:
-        buttons.append(nav_row)
-
-    buttons.append([InlineKeyboardButton("« В управление", callback_data="owner_management")])
-
-    await query.edit_message_text(
-        "\n".join(lines),
-        reply_markup=InlineKeyboardMarkup(buttons),
-        parse_mode="Markdown"
+    await edit_if_changed(
+        query,
+        pages[page],
+        reply_markup=keyboard,
+        parse_mode="HTML"
     )
 
 
@@ -911,6 +984,20 @@ async def show_premises_page(query, context: ContextTypes.DEFAULT_TYPE, page: in
 METERS_PAGE_SIZE = 5  # Meters have more info, so fewer per page
 
 
+def _fmt_meter(m: Dict) -> str:
+    lines = [
+        f"📟 <b>#{m.get('id', '')} {html.escape(str(m.get('Название', '')))}</b>"
+        f" ({html.escape(str(m.get('Помещение', '')))})",
+        f"   👤 Показания: {html.escape(str(m.get('Имя_показания', '')))}",
+        f"   👤 Оплата: {html.escape(str(m.get('Имя_оплата', '')))}",
+    ]
+    to_pay = m.get("Сумма к оплате", 0) or 0
+    if to_pay > 0:
+        lines.append(f"   💰 К оплате: {to_pay:.0f} руб.")
+    lines.append("")
+    return "\n".join(lines)
+
+
 async def mgmt_list_meters_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Show all meters (first page)."""
     query = update.callback_query
@@ -924,7 +1011,7 @@ async def meters_page_callback(update: Update, context: ContextTypes.DEFAULT_TYP
     query = update.callback_query
     await query.answer()
 
-    page = int(query.data.split("_")[-1])
+    page = int(context.match.group(1))
     await show_meters_page(query, context, page)
 
 
@@ -933,62 +1020,47 @@ async def show_meters_page(query, context: ContextTypes.DEFAULT_TYPE, page: int)
     meters = await sheets_service.get_all_meters()
 
     if not meters:
-        await query.edit_message_text(
+        await edit_if_changed(
+            query,
             "📋 Нет счётчиков в системе.",
             reply_markup=get_back_keyboard("owner_management")
         )
         return
 
-    total = len(meters)
-    total_pages = (total + METERS_PAGE_SIZE - 1) // METERS_PAGE_SIZE
+    pages = _get_rendered_pages(
+        "meters", meters, METERS_PAGE_SIZE, "📋 <b>Счётчики:</b>\n", _fmt_meter,
+        "📄 Страница {page} из {total_pages} (всего: {total})",
+    )
+    total_pages = len(pages)
     page = max(0, min(page, total_pages - 1))
 
-    start_idx = page * METERS_PAGE_SIZE
-    end_idx = min(start_idx + METERS_PAGE_SIZE, total)
-    page_items = meters[start_idx:end_idx]
-
-    lines = ["📋 *Счётчики:*\n"]
-    for m in page_items:
-        mid = m.get("id", "")
-        name = m.get("Название", "")
-        premise = m.get("Помещение", "")
-        resp_readings = m.get("Имя_показания", "")
-        resp_payment = m.get("Имя_оплата", "")
-        to_pay = m.get("Сумма к оплате", 0) or 0
-
-        lines.append(f"📟 *#{mid} {name}* ({premise})")
-        lines.append(f"   👤 Показания: {resp_readings}")
-        lines.append(f"   👤 Оплата: {resp_payment}")
-        if to_pay > 0:
-            lines.append(f"   💰 К оплате: {to_pay:.0f} руб.")
-        lines.append("")
+    keyboard = get_pagination_keyboard("meters_page_", page, total_pages, "« В управление", "owner_management")
 
-    if total_pages > 1:
-        lines.append(f"📄 Страница {page + 1} из {total_pages} (всего: {total})")
+    await edit_if_changed(
+        query,
+        pages[page],
+        reply_markup=keyboard,
+        parse_mode="HTML"
+    )
 
-    # Build pagination keyboard
-    buttons = []
-    nav_row = []
 
-    if page > 0:
-        nav_row.append(InlineKeyboardButton("« Назад", callback_data=f"meters_page_{page - 1}"))
-    if page < total_pages - 1:
-        nav_row.append(InlineKeyboardButton("Вперёд »", callback_data=f"meters_page_{page + 1}"))
+# --- Tariffs management ---
 
-    if nav_row:
-        buttons.append(nav_row)
+@dataclass(slots=True)
+class TariffEdit:
+    """Tariff being changed in the edit-tariff conversation."""
+    type: str = ""
+    old_value: float = 0
 
-    buttons.append([InlineKeyboardButton("« В управление", callback_data="owner_management")])
 
-    await query.edit_message_text(
-        "\n".join(lines),
-        reply_markup=InlineKeyboardMarkup(buttons),
-        parse_mode="Markdown"
+def _tariffs_text(tariffs: List[Dict]) -> str:
+    """Tariffs list shown in the management menu."""
+    body = "\n".join(
+        f"• {html.escape(str(t.get('Тип', '')))}: <b>{t.get('Тариф', 0):.2f}</b> руб." for t in tariffs
     )
+    return f"💰 <b>Тарифы:</b>\n\n{body}\n\n<i>Нажмите на тариф для изменения:</i>"
 
 
-# --- Tariffs management ---
-
 async def mgmt_tariffs_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Show all tariffs."""
     query = update.callback_query
@@ -997,25 +1069,19 @@ async def mgmt_tariffs_callback(update: Update, context: ContextTypes.DEFAULT_TY
     tariffs = await sheets_service.get_tariffs()
 
     if not tariffs:
-        await query.edit_message_text(
+        await edit_if_changed(
+            query,
             "💰 Нет тарифов в системе.\n\n"
             "Добавьте тарифы в лист «Тарифы» в Google Sheets.",
             reply_markup=get_back_keyboard("owner_management")
         )
         return
 
-    lines = ["💰 *Тарифы:*\n"]
-    for t in tariffs:
-        tariff_type = t.get("Тип", "")
-        tariff_value = t.get("Тариф", 0)
-        lines.append(f"• {tariff_type}: *{tariff_value:.2f}* руб.")
-
-    lines.append("\n_Нажмите на тариф для изменения:_")
-
-    await query.edit_message_text(
-        "\n".join(lines),
+    await edit_if_changed(
+        query,
+        _tariffs_text(tariffs),
         reply_markup=get_tariffs_keyboard(tariffs),
-        parse_mode="Markdown"
+        parse_mode="HTML"
     )
 
 
@@ -1025,20 +1091,21 @@ async def edit_tariff_callback(update: Update, context: ContextTypes.DEFAULT_TYP
     await query.answer()
 
     # Extract tariff type from callback_data: "edit_tariff_электр"
-    tariff_type = query.data.replace("edit_tariff_", "")
+    tariff_type = context.match.group(1)
     tariff = await sheets_service.get_tariff_by_type(tariff_type)
 
     if not tariff:
-        await query.edit_message_text(
+        await edit_if_changed(
+            query,
             "❌ Тариф не найден.",
             reply_markup=get_back_keyboard("mgmt_tariffs")
         )
         return ConversationHandler.END
 
-    context.user_data["editing_tariff_type"] = tariff_type
-    context.user_data["editing_tariff_old"] = tariff.get("Тариф", 0)
+    context.user_data["tariff_edit"] = TariffEdit(tariff_type, tariff.get("Тариф", 0))
 
-    await query.edit_message_text(
+    await edit_if_changed(
+        query,
         f"💰 *Изменение тарифа*\n\n"
         f"Тип: *{tariff_type}*\n"
         f"Текущее значение: *{tariff.get('Тариф', 0):.2f}* руб.\n\n"
@@ -1052,11 +1119,9 @@ async def edit_tariff_callback(update: Update, context: ContextTypes.DEFAULT_TYP
 
 async def receive_tariff_value(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Process new tariff value."""
-    text = update.message.text.strip()
+    new_value = parse_number(update.message.text)
 
-    try:
-        new_value = float(text.replace(",", "."))
-    except ValueError:
+    if new_value is None:
         await update.message.reply_text(
             "⚠️ Пожалуйста, введите число.\n\n"
             "Например: `5.50` или `45`",
@@ -1073,8 +1138,8 @@ async def receive_tariff_value(update: Update, context: ContextTypes.DEFAULT_TYP
         )
         return EDITING_TARIFF
 
-    tariff_type = context.user_data.get("editing_tariff_type", "")
-    old_value = context.user_data.get("editing_tariff_old", 0)
+    edit = context.user_data.get("tariff_edit") or TariffEdit()
+    tariff_type, old_value = edit.type, edit.old_value
 
     # Update tariff in Google Sheets
     success = await sheets_service.update_tariff(tariff_type, new_value)
@@ -1106,18 +1171,11 @@ async def cancel_tariff_edit_callback(update: Update, context: ContextTypes.DEFA
     # Return to tariffs list
     tariffs = await sheets_service.get_tariffs()
 
-    lines = ["💰 *Тарифы:*\n"]
-    for t in tariffs:
-        tariff_type = t.get("Тип", "")
-        tariff_value = t.get("Тариф", 0)
-        lines.append(f"• {tariff_type}: *{tariff_value:.2f}* руб.")
-
-    lines.append("\n_Нажмите на тариф для изменения:_")
-
-    await query.edit_message_text(
-        "\n".join(lines),
+    await edit_if_changed(
+        query,
+        _tariffs_text(tariffs),
         reply_markup=get_tariffs_keyboard(tariffs),
-        parse_mode="Markdown"
+        parse_mode="HTML"
     )
 
     context.user_data.clear()
@@ -1130,7 +1188,8 @@ async def cancel_management_callback(update: Update, context: ContextTypes.DEFAU
     """Cancel management operation."""
     query = update.callback_query
     await query.answer()
-    await query.edit_message_text(
+    await edit_if_changed(
+        query,
         "❌ Операция отменена.",
         reply_markup=get_owner_management_menu()
     )
@@ -1138,6 +1197,12 @@ async def cancel_management_callback(update: Update, context: ContextTypes.DEFAU
     return ConversationHandler.END
 
 
+async def management_timeout(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    """Drop the draft of a management conversation that timed out."""
+    context.user_data.clear()
+    return ConversationHandler.END
+
+
 def register_owner_handlers(app: Application) -> None:
     """Register owner handlers."""
     # Main menu navigation
@@ -1145,25 +1210,26 @@ def register_owner_handlers(app: Application) -> None:
 
     # Status and info
     app.add_handler(CallbackQueryHandler(owner_readings_status_callback, pattern="^owner_readings_status$"))
-    app.add_handler(CallbackQueryHandler(readings_status_page_callback, pattern=r"^readings_status_page_\d+$"))
+    app.add_handler(CallbackQueryHandler(readings_status_page_callback, pattern=r"^readings_status_page_(\d+)$"))
+    app.add_handler(CallbackQueryHandler(readings_status_refresh_callback, pattern="^readings_status_refresh$"))
     app.add_handler(CallbackQueryHandler(owner_unpaid_callback, pattern="^owner_unpaid$"))
 
     # Issue invoices
     app.add_handler(CallbackQueryHandler(owner_issue_invoice_callback, pattern="^owner_issue_invoice$"))
-    app.add_handler(CallbackQueryHandler(issue_invoice_callback, pattern=r"^issue_invoice_\d+$"))
+    app.add_handler(CallbackQueryHandler(issue_invoice_callback, pattern=r"^issue_invoice_(\d+)$"))
 
     # Reminders submenu
     app.add_handler(CallbackQueryHandler(owner_reminders_callback, pattern="^owner_reminders$"))
     app.add_handler(CallbackQueryHandler(remind_readings_callback, pattern="^remind_readings$"))
     app.add_handler(CallbackQueryHandler(remind_payments_callback, pattern="^remind_payments$"))
-    app.add_handler(CallbackQueryHandler(send_reminder_callback, pattern=r"^remind_(readings|payment)_"))
+    app.add_handler(CallbackQueryHandler(send_reminder_callback, pattern=r"^remind_(readings|payment)_(all|\d+)$"))
 
     # Management submenu
     app.add_handler(CallbackQueryHandler(owner_management_callback, pattern="^owner_management$"))
     app.add_handler(CallbackQueryHandler(mgmt_list_premises_callback, pattern="^mgmt_list_premises$"))
-    app.add_handler(CallbackQueryHandler(premises_page_callback, pattern=r"^premises_page_\d+$"))
+    app.add_handler(CallbackQueryHandler(premises_page_callback, pattern=r"^premises_page_(\d+)$"))
     app.add_handler(CallbackQueryHandler(mgmt_list_meters_callback, pattern="^mgmt_list_meters$"))
-    app.add_handler(CallbackQueryHandler(meters_page_callback, pattern=r"^meters_page_\d+$"))
+    app.add_handler(CallbackQueryHandler(meters_page_callback, pattern=r"^meters_page_(\d+)$"))
 
     # Add premise conversation
     add_premise_conv = ConversationHandler(
@@ -1184,12 +1250,16 @@ def register_owner_handlers(app: Application) -> None:
                 CallbackQueryHandler(edit_premise_callback, pattern="^premise_edit$"),
                 CallbackQueryHandler(cancel_management_callback, pattern="^cancel$"),
             ],
+            ConversationHandler.TIMEOUT: [TypeHandler(Update, management_timeout)],
         },
         fallbacks=[
             CallbackQueryHandler(cancel_management_callback, pattern="^cancel$"),
             CallbackQueryHandler(cancel_management_callback, pattern="^owner_back_main$"),
         ],
         allow_reentry=True,
+        name="add_premise",
+        persistent=app.persistence is not None,
+        conversation_timeout=CONVERSATION_TIMEOUT,
     )
     app.add_handler(add_premise_conv)
 
@@ -1212,11 +1282,11 @@ def register_owner_handlers(app: Application) -> None:
                 CallbackQueryHandler(cancel_management_callback, pattern="^cancel$"),
             ],
             SELECTING_METER_RESPONSIBLE_READINGS: [
-                CallbackQueryHandler(meter_responsible_readings_callback, pattern=r"^meter_resp_read_\d+$"),
+                CallbackQueryHandler(meter_responsible_readings_callback, pattern=r"^meter_resp_read_(\d+)$"),
                 CallbackQueryHandler(cancel_management_callback, pattern="^cancel$"),
             ],
             SELECTING_METER_RESPONSIBLE_PAYMENT: [
-                CallbackQueryHandler(meter_responsible_payment_callback, pattern=r"^meter_resp_pay_\d+$"),
+                CallbackQueryHandler(meter_responsible_payment_callback, pattern=r"^meter_resp_pay_(\d+)$"),
                 CallbackQueryHandler(cancel_management_callback, pattern="^cancel$"),
             ],
             CONFIRMING_METER: [
@@ -1224,17 +1294,21 @@ def register_owner_handlers(app: Application) -> None:
                 CallbackQueryHandler(edit_meter_callback, pattern="^meter_edit$"),
                 CallbackQueryHandler(cancel_management_callback, pattern="^cancel$"),
             ],
+            ConversationHandler.TIMEOUT: [TypeHandler(Update, management_timeout)],
         },
         fallbacks=[
             CallbackQueryHandler(cancel_management_callback, pattern="^cancel$"),
             CallbackQueryHandler(cancel_management_callback, pattern="^owner_back_main$"),
         ],
         allow_reentry=True,
+        name="add_meter",
+        persistent=app.persistence is not None,
+        conversation_timeout=CONVERSATION_TIMEOUT,
     )
     app.add_handler(add_meter_conv)
 
     # Meter premise selection (intermediate step)
-    app.add_handler(CallbackQueryHandler(meter_premise_selected_callback, pattern=r"^meter_premise_\d+$"))
+    app.add_handler(CallbackQueryHandler(meter_premise_selected_callback, pattern=r"^meter_premise_(\d+)$"))
 
     # Tariffs management
     app.add_handler(CallbackQueryHandler(mgmt_tariffs_callback, pattern="^mgmt_tariffs$"))
@@ -1242,18 +1316,22 @@ def register_owner_handlers(app: Application) -> None:
     # Edit tariff conversation
     edit_tariff_conv = ConversationHandler(
         entry_points=[
-            CallbackQueryHandler(edit_tariff_callback, pattern=r"^edit_tariff_.+$")
+            CallbackQueryHandler(edit_tariff_callback, pattern=r"^edit_tariff_(.+)$")
         ],
         states={
             EDITING_TARIFF: [
                 MessageHandler(filters.TEXT & ~filters.COMMAND, receive_tariff_value),
                 CallbackQueryHandler(cancel_tariff_edit_callback, pattern="^cancel$"),
             ],
+            ConversationHandler.TIMEOUT: [TypeHandler(Update, management_timeout)],
         },
         fallbacks=[
             CallbackQueryHandler(cancel_tariff_edit_callback, pattern="^cancel$"),
             CallbackQueryHandler(cancel_tariff_edit_callback, pattern="^mgmt_tariffs$"),
         ],
         allow_reentry=True,
+        name="edit_tariff",
+        persistent=app.persistence is not None,
+        conversation_timeout=CONVERSATION_TIMEOUT,
     )
     app.add_handler(edit_tariff_conv)
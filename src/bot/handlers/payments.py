@@ -1,4 +1,10 @@
-from telegram import Update
+import asyncio
+import io
+import logging
+from typing import Dict, Tuple
+
+from telegram import Bot, Update
+from telegram.error import TelegramError
 from telegram.ext import (
     Application,
     CallbackQueryHandler,
@@ -8,61 +14,61 @@ from telegram.ext import (
     filters,
 )
 
-from src.bot.keyboards import get_cancel_keyboard, get_back_keyboard, get_edit_confirm_keyboard
+from src.bot.keyboards import (
+    get_cancel_keyboard,
+    get_back_keyboard,
+    get_edit_confirm_keyboard,
+    get_premises_to_pay_keyboard,
+)
+from src.bot.templates import format_breakdown
+from src.bot.utils import reply_or_edit
 from src.services.sheets import sheets_service
-from src.services.storage import storage_service
+from src.services.storage import MAX_RECEIPT_BYTES, storage_service
+
+logger = logging.getLogger(__name__)
 
 # Conversation states
 UPLOADING_RECEIPT = 1
 CONFIRMING_PAYMENT = 2
 
-
-def get_premises_to_pay_keyboard(invoices):
-    """Generate keyboard with premises that have unpaid amounts."""
-    from telegram import InlineKeyboardButton, InlineKeyboardMarkup
-
-    buttons = []
-    for inv in invoices:
-        premise_id = inv.get("помещение_id")
-        premise_name = inv.get("Помещение", "")
-        amount = inv.get("Сумма", 0)
-        label = f"💳 {premise_name}: {amount:.0f} руб."
-        buttons.append([InlineKeyboardButton(label, callback_data=f"pay_premise_{premise_id}")])
-
-    buttons.append([InlineKeyboardButton("« Назад", callback_data="back_main")])
-    return InlineKeyboardMarkup(buttons)
+# Receipt uploads started when the photo arrives, by (telegram_id, file_unique_id).
+# Only in-flight uploads are kept: finished ones are remembered by storage_service.
+# (Tasks can't go in user_data, which may be pickled by persistence.)
+_receipt_uploads: Dict[Tuple[int, str], asyncio.Task] = {}
 
 
-async def menu_invoices_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Show unpaid invoices for tenant."""
-    query = update.callback_query
-    await query.answer()
-
+async def show_tenant_invoices(update: Update) -> None:
+    """Display unpaid invoices for tenant (message or callback)."""
     user_id = update.effective_user.id
     invoices = await sheets_service.get_unpaid_invoices_for_tenant(user_id)
 
     if not invoices:
-        await query.edit_message_text(
+        await reply_or_edit(
+            update,
             "✨ У Вас нет неоплаченных счетов. Всё оплачено!",
             reply_markup=get_back_keyboard()
         )
         return
 
-    # Build summary
-    total = sum(inv.get("Сумма", 0) for inv in invoices)
+    # Build summary and keyboard items in one pass
     lines = ["💳 *Ваши неоплаченные счета:*\n"]
+    items = []
+    total = 0
 
     for inv in invoices:
-        premise = inv.get("Помещение", "")
-        amount = inv.get("Сумма", 0)
-        lines.append(f"• {premise}: {amount:.0f} руб.")
+        amount = inv["Сумма"]
+        total += amount
+        label = f"{inv.get('Помещение', '')}: {amount:.0f} руб."
+        lines.append(f"• {label}")
+        items.append((inv.get("помещение_id"), label))
 
     lines.append(f"\n📋 *Итого к оплате: {total:.0f} руб.*")
     lines.append("\nВыберите помещение для оплаты:")
 
-    await query.edit_message_text(
+    await reply_or_edit(
+        update,
         "\n".join(lines),
-        reply_markup=get_premises_to_pay_keyboard(invoices),
+        reply_markup=get_premises_to_pay_keyboard(items),
         parse_mode="Markdown"
     )
 
@@ -72,9 +78,17 @@ async def pay_premise_callback(update: Update, context: ContextTypes.DEFAULT_TYP
     query = update.callback_query
     await query.answer()
 
-    # Extract premise_id from callback_data: "pay_premise_123"
-    premise_id = int(query.data.split("_")[2])
-    invoice = await sheets_service.get_invoice_for_premise(premise_id)
+    # premise_id captured from callback_data: "pay_premise_123"
+    premise_id = int(context.match.group(1))
+    user_id = update.effective_user.id
+
+    # Invoice, payment details and meters breakdown (only meters where user
+    # is responsible for payment) are independent reads
+    invoice, payment_details, meters = await asyncio.gather(
+        sheets_service.get_invoice_for_premise(premise_id),
+        sheets_service.get_payment_details(),
+        sheets_service.get_meters_by_premise_and_responsible(premise_id, user_id),
+    )
 
     if not invoice:
         await query.edit_message_text("❌ Счёт не найден.")
@@ -90,26 +104,7 @@ async def pay_premise_callback(update: Update, context: ContextTypes.DEFAULT_TYP
     context.user_data["selected_invoice"] = invoice
 
     premise_name = invoice.get("Помещение", "")
-
-    # Get payment details
-    payment_details = await sheets_service.get_payment_details()
-
-    # Get meters breakdown - only meters where user is responsible for payment
-    user_id = update.effective_user.id
-    meters = await sheets_service.get_meters_by_premise(premise_id)
-    breakdown_lines = []
-    for meter in meters:
-        # Only show meters where this user is responsible for payment
-        if str(meter.get("ответственный_оплата")) != str(user_id):
-            continue
-        meter_name = meter.get("Название", "")
-        consumption = meter.get("Расход к оплате", 0) or 0
-        unit = meter.get("Единица", "")
-        tariff = meter.get("Тариф", 0) or 0
-        if consumption > 0:
-            breakdown_lines.append(f"   📟 {meter_name}: {consumption:.2f} {unit} × {tariff:.2f} руб.")
-
-    breakdown = "\n".join(breakdown_lines) if breakdown_lines else "   (нет данных)"
+    breakdown = format_breakdown(meters) or "   (нет данных)"
 
     await query.edit_message_text(
         f"💳 *Оплата счёта*\n\n"
@@ -145,8 +140,23 @@ async def receive_receipt_photo(update: Update, context: ContextTypes.DEFAULT_TY
         await update.message.reply_text("❌ Ошибка: данные потеряны. Пожалуйста, начните сначала.")
         return ConversationHandler.END
 
+    photo = update.message.photo[-1]
+    if photo.file_size and photo.file_size > MAX_RECEIPT_BYTES:
+        await update.message.reply_text(
+            "⚠️ Фотография слишком большая. Пожалуйста, отправьте фото меньшего размера.",
+            reply_markup=get_cancel_keyboard(),
+        )
+        return UPLOADING_RECEIPT
+
     # Store photo for confirmation
-    context.user_data["receipt_photo"] = update.message.photo[-1]
+    context.user_data["receipt_photo"] = photo
+
+    # Upload the receipt while the user reviews the confirmation
+    key = (user.id, photo.file_unique_id)
+    if key not in _receipt_uploads:
+        task = context.application.create_task(_upload_receipt_photo(photo, user.id))
+        _receipt_uploads[key] = task
+        task.add_done_callback(lambda _: _receipt_uploads.pop(key, None))
 
     premise_name = invoice.get("Помещение", "")
     amount = invoice.get("Сумма", 0) or 0
@@ -164,15 +174,63 @@ async def receive_receipt_photo(update: Update, context: ContextTypes.DEFAULT_TY
     return CONFIRMING_PAYMENT
 
 
+async def _upload_receipt_photo(photo, telegram_id: int) -> str:
+    """Download the receipt photo from Telegram and upload it to R2.
+
+    A photo the user already uploaded (e.g. a repeated confirm) reuses
+    the stored URL without downloading it again.
+    """
+    receipt_url = storage_service.get_uploaded_receipt(telegram_id, photo.file_unique_id)
+    if receipt_url:
+        return receipt_url
+
+    file = await photo.get_file()
+    buf = io.BytesIO()
+    await file.download_to_memory(buf)
+    buf.seek(0)
+
+    return await storage_service.upload_receipt(
+        fileobj=buf,
+        telegram_id=telegram_id,
+        file_id=photo.file_id,
+        file_unique_id=photo.file_unique_id,
+    )
+
+
+async def _get_receipt_url(photo, telegram_id: int) -> str:
+    """Get the receipt URL, waiting for an upload started on photo receipt.
+
+    If that upload failed, the photo is uploaded again.
+    """
+    task = _receipt_uploads.get((telegram_id, photo.file_unique_id))
+    if task is not None:
+        try:
+            return await asyncio.shield(task)
+        except Exception:
+            logger.warning("Receipt upload failed, retrying", exc_info=True)
+    return await _upload_receipt_photo(photo, telegram_id)
+
+
+async def _notify_owner(bot: Bot, owner_id: int, text: str) -> None:
+    """Send the payment notification to the owner."""
+    try:
+        await bot.send_message(chat_id=owner_id, text=text, parse_mode="Markdown")
+    except TelegramError:
+        # Owner might have blocked the bot
+        logger.warning("Failed to notify owner %s about payment", owner_id, exc_info=True)
+
+
 async def confirm_payment_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Confirm and process payment."""
     query = update.callback_query
+    # Take the payment out of user_data before any await, so a double tap
+    # (updates run concurrently) finds it gone instead of paying twice
+    premise_id = context.user_data.pop("selected_premise_id", None)
+    invoice = context.user_data.pop("selected_invoice", None)
+    photo = context.user_data.pop("receipt_photo", None)
     await query.answer()
 
     user = update.effective_user
-    premise_id = context.user_data.get("selected_premise_id")
-    invoice = context.user_data.get("selected_invoice")
-    photo = context.user_data.get("receipt_photo")
 
     if not premise_id or not invoice or not photo:
         await query.edit_message_text("❌ Ошибка: данные потеряны. Пожалуйста, начните сначала.")
@@ -181,32 +239,34 @@ async def confirm_payment_callback(update: Update, context: ContextTypes.DEFAULT
     # Show loading message
     await query.edit_message_text("⏳ Обрабатываем Вашу оплату...")
 
-    # Get file and download
-    file = await photo.get_file()
-    photo_bytes = await file.download_as_bytearray()
-
-    # Upload to R2
-    receipt_url = await storage_service.upload_receipt(
-        file_bytes=bytes(photo_bytes),
-        telegram_id=user.id,
-        file_id=photo.file_id,
-    )
-
-    # Get tenant info
-    tenant = await sheets_service.get_tenant(user.id)
-    tenant_name = tenant.get("Имя", "") if tenant else ""
     premise_name = invoice.get("Помещение", "")
     amount = invoice.get("Сумма", 0) or 0
-
-    # Process payment (updates meters, saves log, updates invoice status)
-    await sheets_service.process_payment(
-        premise_id=premise_id,
-        premise_name=premise_name,
-        telegram_id=user.id,
-        tenant_name=tenant_name,
-        amount=amount,
-        receipt_url=receipt_url,
-    )
+    try:
+        # Upload receipt to R2 while looking up tenant and owner for the notifications
+        receipt_url, tenant, owner = await asyncio.gather(
+            _get_receipt_url(photo, user.id),
+            sheets_service.get_tenant(user.id),
+            sheets_service.get_owner(),
+        )
+        tenant_name = tenant.get("Имя", "") if tenant else ""
+
+        # Process payment (updates meters, saves log, updates invoice status)
+        await sheets_service.process_payment(
+            premise_id=premise_id,
+            premise_name=premise_name,
+            telegram_id=user.id,
+            tenant_name=tenant_name,
+            amount=amount,
+            receipt_url=receipt_url,
+        )
+    except Exception:
+        logger.exception("Failed to process payment of %s for premise %s", user.id, premise_id)
+        await query.edit_message_text(
+            "❌ Не удалось зафиксировать оплату. Пожалуйста, попробуйте ещё раз.",
+            reply_markup=get_back_keyboard(),
+        )
+        context.user_data.clear()
+        return ConversationHandler.END
 
     # Notify tenant
     await query.edit_message_text(
@@ -219,23 +279,19 @@ async def confirm_payment_callback(update: Update, context: ContextTypes.DEFAULT
         parse_mode="Markdown"
     )
 
-    # Notify owner
-    owner = await sheets_service.get_owner()
+    # Notify owner in the background; the tenant already has the confirmation
     if owner and tenant:
-        try:
-            await context.bot.send_message(
-                chat_id=owner["telegram_id"],
-                text=(
-                    f"💰 *Получена оплата!*\n\n"
-                    f"👤 Арендатор: {tenant_name}\n"
-                    f"🏠 Помещение: {premise_name}\n"
-                    f"💵 Сумма: *{amount:.0f} руб.*\n"
-                    f"📸 [Чек]({receipt_url})"
-                ),
-                parse_mode="Markdown"
+        context.application.create_task(
+            _notify_owner(
+                context.bot,
+                owner["telegram_id"],
+                f"💰 *Получена оплата!*\n\n"
+                f"👤 Арендатор: {tenant_name}\n"
+                f"🏠 Помещение: {premise_name}\n"
+                f"💵 Сумма: *{amount:.0f} руб.*\n"
+                f"📸 [Чек]({receipt_url})",
             )
-        except Exception:
-            pass  # Owner might have blocked the bot
+        )
 
     # Clear user data
     context.user_data.clear()
@@ -279,7 +335,7 @@ def register_payment_handlers(app: Application) -> None:
     # Conversation handler for payment with receipt upload
     payment_conv = ConversationHandler(
         entry_points=[
-            CallbackQueryHandler(pay_premise_callback, pattern=r"^pay_premise_\d+$")
+            CallbackQueryHandler(pay_premise_callback, pattern=r"^pay_premise_(\d+)$")
         ],
         states={
             UPLOADING_RECEIPT: [
@@ -296,6 +352,8 @@ def register_payment_handlers(app: Application) -> None:
             CallbackQueryHandler(cancel_payment_callback, pattern="^cancel$"),
         ],
         allow_reentry=True,
+        name="payment",
+        persistent=app.persistence is not None,
     )
 
     app.add_handler(payment_conv)
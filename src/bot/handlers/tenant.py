@@ -9,6 +9,7 @@ from telegram.ext import (
 )
 
 from src.bot.keyboards import get_cancel_keyboard, get_back_keyboard, get_meters_keyboard, get_edit_confirm_keyboard
+from src.bot.utils import parse_number
 from src.services.sheets import sheets_service
 
 # Conversation states
@@ -21,8 +22,8 @@ async def meter_selected_callback(update: Update, context: ContextTypes.DEFAULT_
     query = update.callback_query
     await query.answer()
 
-    # Extract meter_id from callback_data: "meter_123"
-    meter_id = int(query.data.split("_")[1])
+    # meter_id captured from callback_data: "meter_123"
+    meter_id = int(context.match.group(1))
     meter = await sheets_service.get_meter(meter_id)
 
     if not meter:
@@ -55,11 +56,9 @@ async def meter_selected_callback(update: Update, context: ContextTypes.DEFAULT_
 
 async def receive_reading(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Process meter reading input."""
-    text = update.message.text.strip()
+    value = parse_number(update.message.text)
 
-    try:
-        value = float(text.replace(",", "."))
-    except ValueError:
+    if value is None:
         await update.message.reply_text(
             "⚠️ Пожалуйста, введите число.\n\n"
             "Например: `12345` или `123.45`",
@@ -201,7 +200,7 @@ def register_tenant_handlers(app: Application) -> None:
     # Conversation handler for meter readings
     readings_conv = ConversationHandler(
         entry_points=[
-            CallbackQueryHandler(meter_selected_callback, pattern=r"^meter_\d+$")
+            CallbackQueryHandler(meter_selected_callback, pattern=r"^meter_(\d+)$")
         ],
         states={
             ENTERING_READING: [
@@ -219,6 +218,8 @@ def register_tenant_handlers(app: Application) -> None:
             CallbackQueryHandler(cancel_reading_callback, pattern="^back_main$"),
         ],
         allow_reentry=True,  # Allow starting new conversation even if previous wasn't finished
+        name="readings",
+        persistent=app.persistence is not None,
     )
 
     app.add_handler(readings_conv)
@@ -1,29 +1,43 @@
-from typing import List, Dict
+from functools import lru_cache
+from typing import Any, List, Dict, Tuple
 
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton
 
 
 # === Reply Keyboards (постоянные кнопки внизу) ===
 
+# Reply button labels (also used for exact-match dispatch in handlers)
+BTN_READINGS = "📊 Сдать показания"
+BTN_MY_INVOICES = "💳 Мои счета"
+BTN_MY_METERS = "🔧 Мои счетчики"
+BTN_READINGS_STATUS = "📊 Статус показаний"
+BTN_UNPAID = "💰 Неоплаченные"
+BTN_ISSUE_INVOICE = "📨 Выставить счёт"
+BTN_REMINDERS = "🔔 Напоминания"
+BTN_MANAGEMENT = "⚙️ Управление"
+
+
+@lru_cache(maxsize=None)
 def get_tenant_reply_keyboard() -> ReplyKeyboardMarkup:
     """Persistent reply keyboard for tenant."""
     return ReplyKeyboardMarkup(
         [
-            [KeyboardButton("📊 Сдать показания"), KeyboardButton("💳 Мои счета")],
-            [KeyboardButton("🔧 Мои счетчики")],
+            [KeyboardButton(BTN_READINGS), KeyboardButton(BTN_MY_INVOICES)],
+            [KeyboardButton(BTN_MY_METERS)],
         ],
         resize_keyboard=True,
         is_persistent=True,
     )
 
 
+@lru_cache(maxsize=None)
 def get_owner_reply_keyboard() -> ReplyKeyboardMarkup:
     """Persistent reply keyboard for owner."""
     return ReplyKeyboardMarkup(
         [
-            [KeyboardButton("📊 Статус показаний"), KeyboardButton("💰 Неоплаченные")],
-            [KeyboardButton("📨 Выставить счёт"), KeyboardButton("🔔 Напоминания")],
-            [KeyboardButton("⚙️ Управление")],
+            [KeyboardButton(BTN_READINGS_STATUS), KeyboardButton(BTN_UNPAID)],
+            [KeyboardButton(BTN_ISSUE_INVOICE), KeyboardButton(BTN_REMINDERS)],
+            [KeyboardButton(BTN_MANAGEMENT)],
         ],
         resize_keyboard=True,
         is_persistent=True,
@@ -32,6 +46,7 @@ def get_owner_reply_keyboard() -> ReplyKeyboardMarkup:
 
 # === Главное меню (Inline) ===
 
+@lru_cache(maxsize=4)
 def get_tenant_main_menu(has_readings: bool = True, has_invoices: bool = True) -> InlineKeyboardMarkup:
     """Inline main menu for tenant."""
     buttons = []
@@ -43,6 +58,7 @@ def get_tenant_main_menu(has_readings: bool = True, has_invoices: bool = True) -
     return InlineKeyboardMarkup(buttons)
 
 
+@lru_cache(maxsize=None)
 def get_owner_main_menu() -> InlineKeyboardMarkup:
     """Inline main menu for owner."""
     return InlineKeyboardMarkup([
@@ -54,6 +70,7 @@ def get_owner_main_menu() -> InlineKeyboardMarkup:
     ])
 
 
+@lru_cache(maxsize=None)
 def get_owner_management_menu() -> InlineKeyboardMarkup:
     """Management submenu for owner."""
     return InlineKeyboardMarkup([
@@ -78,6 +95,7 @@ def get_tariffs_keyboard(tariffs: List[Dict]) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(buttons)
 
 
+@lru_cache(maxsize=None)
 def get_owner_reminders_menu() -> InlineKeyboardMarkup:
     """Reminders submenu for owner."""
     return InlineKeyboardMarkup([
@@ -119,6 +137,20 @@ def get_invoices_keyboard(invoices: List[Dict]) -> InlineKeyboardMarkup:
 
 # === Выбор помещения ===
 
+def get_premises_to_pay_keyboard(items: List[Tuple[Any, str]]) -> InlineKeyboardMarkup:
+    """Generate keyboard with premises that have unpaid amounts.
+
+    `items` are (premise_id, "name: amount") pairs built by the caller
+    while it formats the invoice summary.
+    """
+    buttons = [
+        [InlineKeyboardButton(f"💳 {label}", callback_data=f"pay_premise_{premise_id}")]
+        for premise_id, label in items
+    ]
+    buttons.append([InlineKeyboardButton("« Назад", callback_data="back_main")])
+    return InlineKeyboardMarkup(buttons)
+
+
 def get_premises_keyboard(premises: List[Dict], callback_prefix: str = "premise") -> InlineKeyboardMarkup:
     """Keyboard with premise buttons."""
     buttons = []
@@ -145,6 +177,7 @@ def get_tenants_keyboard(tenants: List[Dict], callback_prefix: str = "tenant") -
 
 # === Кнопки действий ===
 
+@lru_cache(maxsize=None)
 def get_cancel_keyboard() -> InlineKeyboardMarkup:
     """Cancel button."""
     return InlineKeyboardMarkup([
@@ -152,13 +185,42 @@ def get_cancel_keyboard() -> InlineKeyboardMarkup:
     ])
 
 
+@lru_cache(maxsize=16)
 def get_back_keyboard(callback_data: str = "back_main") -> InlineKeyboardMarkup:
-    """Back button."""
+    """Back button (markups are immutable, so one instance per callback_data is reused)."""
     return InlineKeyboardMarkup([
         [InlineKeyboardButton("« Назад", callback_data=callback_data)]
     ])
 
 
+@lru_cache(maxsize=64)
+def get_pagination_keyboard(
+    page_prefix: str,
+    page: int,
+    total_pages: int,
+    back_text: str,
+    back_data: str,
+    refresh_data: str = "",
+) -> InlineKeyboardMarkup:
+    """Prev/next navigation for paginated lists, plus optional refresh and back rows."""
+    buttons = []
+    nav_row = []
+
+    if page > 0:
+        nav_row.append(InlineKeyboardButton("« Назад", callback_data=f"{page_prefix}{page - 1}"))
+    if page < total_pages - 1:
+        nav_row.append(InlineKeyboardButton("Вперёд »", callback_data=f"{page_prefix}{page + 1}"))
+
+    if nav_row:
+        buttons.append(nav_row)
+
+    if refresh_data:
+        buttons.append([InlineKeyboardButton("🔄 Обновить", callback_data=refresh_data)])
+    buttons.append([InlineKeyboardButton(back_text, callback_data=back_data)])
+    return InlineKeyboardMarkup(buttons)
+
+
+@lru_cache(maxsize=64)
 def get_confirm_keyboard(confirm_data: str, cancel_data: str = "cancel") -> InlineKeyboardMarkup:
     """Confirm/Cancel buttons."""
     return InlineKeyboardMarkup([
@@ -169,6 +231,7 @@ def get_confirm_keyboard(confirm_data: str, cancel_data: str = "cancel") -> Inli
     ])
 
 
+@lru_cache(maxsize=64)
 def get_edit_confirm_keyboard(edit_data: str, confirm_data: str) -> InlineKeyboardMarkup:
     """Edit/Confirm buttons for data confirmation step."""
     return InlineKeyboardMarkup([
@@ -0,0 +1,133 @@
+import html
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+# Notification sent to the payer when an invoice is issued (Markdown)
+INVOICE_NOTIFICATION_TPL = (
+    "📨 *Вам выставлен счёт на оплату!*\n\n"
+    "🏠 Помещение: {premise}\n"
+    "💰 Сумма: *{amount:.0f} руб.*\n"
+    "{breakdown_section}\n"
+    "🏦 *Реквизиты для оплаты:*\n`{payment_details}`\n\n"
+    "📸 После оплаты, пожалуйста, отправьте фото чека через бот.\n\n"
+    "Нажмите кнопку «💳 Мои счета» в меню."
+)
+
+# Notification for a payer with invoices for several premises (Markdown)
+INVOICES_NOTIFICATION_TPL = (
+    "📨 *Вам выставлены счета на оплату!*\n\n"
+    "{premises_section}\n"
+    "📋 *Итого к оплате: {total:.0f} руб.*\n\n"
+    "🏦 *Реквизиты для оплаты:*\n`{payment_details}`\n\n"
+    "📸 После оплаты, пожалуйста, отправьте фото чека через бот.\n\n"
+    "Нажмите кнопку «💳 Мои счета» в меню."
+)
+
+INVOICE_PREMISE_SECTION_TPL = (
+    "🏠 Помещение: {premise}\n"
+    "💰 Сумма: *{amount:.0f} руб.*\n"
+    "{breakdown_section}"
+)
+
+# Reminders sent by the owner from the reminders menu (HTML, so that
+# payment details with "_" or "*" can't break parsing)
+READINGS_REMINDER_TEXT = (
+    "📊 <b>Напоминание о показаниях</b>\n\n"
+    "Пожалуйста, не забудьте сдать показания счётчиков.\n\n"
+    "Нажмите кнопку «📊 Сдать показания» в меню бота."
+)
+
+PAYMENT_REMINDER_TPL = (
+    "💳 <b>Напоминание об оплате</b>\n\n"
+    "💰 К оплате: <b>{total:.0f} руб.</b>\n\n"
+    "🏦 <b>Реквизиты:</b>\n<code>{payment_details}</code>\n\n"
+    "📸 После оплаты, пожалуйста, отправьте фото чека через бот."
+)
+
+# Scheduled reminders sent by the job queue (Markdown)
+SCHEDULED_READINGS_REMINDER_TPL = (
+    "📊 *Напоминание о показаниях*\n\n"
+    "Пожалуйста, не забудьте сдать показания счётчиков.\n\n"
+    "📟 Ожидаем показания: {meters_text}\n\n"
+    "Нажмите кнопку «📊 Сдать показания» в меню бота."
+)
+
+SCHEDULED_PAYMENT_REMINDER_TPL = (
+    "💳 *Напоминание об оплате*\n\n"
+    "💰 К оплате: *{total:.0f} руб.*"
+    "{premises_section}\n\n"
+    "🏦 *Реквизиты:*\n`{payment_details}`\n\n"
+    "📸 После оплаты, пожалуйста, отправьте фото чека через бот.\n\n"
+    "Нажмите кнопку «💳 Мои счета» в меню."
+)
+
+BREAKDOWN_LINE_TPL = "   📟 {name}: {consumption:.2f} {unit} × {tariff:.2f} руб."
+
+
+def format_breakdown(meters: List[Dict]) -> str:
+    """Per-meter consumption lines for meters with something to pay."""
+    return "\n".join(
+        BREAKDOWN_LINE_TPL.format(
+            name=m.get("Название", ""),
+            consumption=consumption,
+            unit=m.get("Единица", ""),
+            tariff=m.get("Тариф", 0) or 0,
+        )
+        for m in meters
+        if (consumption := m.get("Расход к оплате", 0) or 0) > 0
+    )
+
+
+def render_invoice_notification(premise: str, amount: float, meters: List[Dict], payment_details: str) -> str:
+    """Build the invoice notification text for the payer."""
+    breakdown = format_breakdown(meters)
+    return INVOICE_NOTIFICATION_TPL.format_map({
+        "premise": premise,
+        "amount": amount,
+        "breakdown_section": f"\n📊 *Детализация:*\n{breakdown}\n" if breakdown else "",
+        "payment_details": payment_details,
+    })
+
+
+def render_invoices_notification(
+    invoices: List[Tuple[str, float, List[Dict]]], payment_details: str
+) -> str:
+    """Build one notification for a payer's (premise, amount, meters) invoices."""
+    if len(invoices) == 1:
+        return render_invoice_notification(*invoices[0], payment_details)
+
+    sections = []
+    for premise, amount, meters in invoices:
+        breakdown = format_breakdown(meters)
+        sections.append(INVOICE_PREMISE_SECTION_TPL.format_map({
+            "premise": premise,
+            "amount": amount,
+            "breakdown_section": f"📊 *Детализация:*\n{breakdown}\n" if breakdown else "",
+        }))
+    return INVOICES_NOTIFICATION_TPL.format_map({
+        "premises_section": "\n".join(sections),
+        "total": sum(amount for _, amount, _ in invoices),
+        "payment_details": payment_details,
+    })
+
+
+@lru_cache(maxsize=128)
+def render_payment_reminder(total: float, payment_details: str) -> str:
+    """Build the payment reminder text (memoized: totals repeat across tenants)."""
+    return PAYMENT_REMINDER_TPL.format(total=total, payment_details=html.escape(payment_details))
+
+
+def render_scheduled_readings_reminder(meters: List[str]) -> str:
+    """Build the scheduled readings reminder for a tenant's pending meters."""
+    return SCHEDULED_READINGS_REMINDER_TPL.format_map({
+        "meters_text": ", ".join(meters) if meters else "Ваши счётчики",
+    })
+
+
+def render_scheduled_payment_reminder(total: float, premises: List[str], payment_details: str) -> str:
+    """Build the scheduled payment reminder for a tenant."""
+    return SCHEDULED_PAYMENT_REMINDER_TPL.format_map({
+        "total": total,
+        "premises_section": f"\n🏠 Помещения: {', '.join(premises)}" if premises else "",
+        "payment_details": payment_details,
+    })
@@ -0,0 +1,57 @@
+import re
+from typing import Optional
+
+from telegram import CallbackQuery, Message, Update
+
+# Plain decimal number typed by a user: "45", "5.50", "5,50", "-3"
+NUMBER_RE = re.compile(r"-?\d+(?:[.,]\d*)?")
+
+
+def parse_number(text: str) -> Optional[float]:
+    """Parse a user-typed decimal number, or None if the text is not one.
+
+    Unlike bare float(), rejects "nan", "inf", exponents and underscores.
+    """
+    text = text.strip()
+    if not NUMBER_RE.fullmatch(text):
+        return None
+    return float(text.replace(",", "."))
+
+
+def _rendered_text(message: Message, parse_mode: Optional[str]) -> Optional[str]:
+    """Message text re-rendered in the markup it would be sent with."""
+    if message.text is None:
+        return None
+    try:
+        if parse_mode == "Markdown":
+            return message.text_markdown
+        if parse_mode == "HTML":
+            return message.text_html
+    except ValueError:
+        # Entities not expressible in the requested markup
+        return None
+    return message.text
+
+
+async def edit_if_changed(query: CallbackQuery, text: str, **kwargs) -> None:
+    """Edit the callback's message unless it already shows this text and keyboard.
+
+    Saves the round-trip that Telegram would reject with
+    "message is not modified" when the same button is tapped again.
+    """
+    message = query.message
+    if (
+        isinstance(message, Message)
+        and message.reply_markup == kwargs.get("reply_markup")
+        and _rendered_text(message, kwargs.get("parse_mode")) == text
+    ):
+        return
+    await query.edit_message_text(text, **kwargs)
+
+
+async def reply_or_edit(update: Update, text: str, **kwargs) -> None:
+    """Edit the message for callback queries, reply to it for text messages."""
+    if update.callback_query:
+        await edit_if_changed(update.callback_query, text, **kwargs)
+    else:
+        await update.message.reply_text(text, **kwargs)
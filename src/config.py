@@ -1,4 +1,7 @@
 import json
+from functools import cached_property
+from zoneinfo import ZoneInfo
+
 from pydantic_settings import BaseSettings
 
 
@@ -15,14 +18,32 @@ class Settings(BaseSettings):
 
     owner_telegram_id: int
 
+    # Webhook mode (polling is used when webhook_url is empty)
+    webhook_url: str = ""  # Public HTTPS base URL, e.g. https://bot.example.com
+    webhook_port: int = 8443
+    webhook_secret_token: str = ""
+
+    # Max number of updates processed concurrently
+    concurrent_updates: int = 256
+
+    # File for conversation/user state across restarts (disabled when empty)
+    persistence_file: str = ""
+
+    # Timezone for scheduled jobs and reminder day checks
+    timezone: str = "Europe/Moscow"
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
 
-    @property
+    @cached_property
     def google_credentials(self) -> dict:
         return json.loads(self.google_service_account_json)
 
+    @cached_property
+    def tzinfo(self) -> ZoneInfo:
+        return ZoneInfo(self.timezone)
+
     @property
     def r2_endpoint_url(self) -> str:
         return f"https://{self.r2_account_id}.r2.cloudflarestorage.com"
@@ -1,7 +1,9 @@
+import asyncio
 import logging
 
-from telegram import BotCommand
-from telegram.ext import Application
+from telegram import BotCommand, BotCommandScopeChat
+from telegram.ext import AIORateLimiter, Application, Defaults, PicklePersistence
+from telegram.request import HTTPXRequest
 
 from src.bot.handlers import (
     register_common_handlers,
@@ -12,6 +14,7 @@ from src.bot.handlers import (
 from src.config import settings
 from src.services.scheduler import setup_scheduler
 from src.services.sheets import sheets_service
+from src.services.storage import storage_service
 
 logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
@@ -45,7 +48,6 @@ async def setup_bot_commands(app: Application) -> None:
     if owner:
         owner_id = owner.get("telegram_id")
         if owner_id:
-            from telegram import BotCommandScopeChat
             await bot.set_my_commands(
                 OWNER_COMMANDS,
                 scope=BotCommandScopeChat(chat_id=owner_id)
@@ -56,19 +58,50 @@ async def setup_bot_commands(app: Application) -> None:
 
 async def post_init(app: Application) -> None:
     """Post-initialization hook."""
-    await setup_bot_commands(app)
+    # Owner lookup for commands and the payment-path reads share one warm-up
+    await asyncio.gather(
+        setup_bot_commands(app),
+        sheets_service.warm_up(),
+        storage_service.warm_up(),
+    )
+
+
+async def post_shutdown(app: Application) -> None:
+    """Post-shutdown hook."""
+    await sheets_service.flush_writes()
 
 
 def main() -> None:
     """Start the bot."""
     logger.info("Starting rental bot...")
 
-    app = (
+    builder = (
         Application.builder()
         .token(settings.telegram_bot_token)
+        .concurrent_updates(settings.concurrent_updates)
+        # Job times (e.g. reminders at 10:00) are in the configured local timezone
+        .defaults(Defaults(tzinfo=settings.tzinfo))
+        # Shared keep-alive pool for outgoing API calls; must be at least
+        # BroadcastService.MAX_CONCURRENT_SENDS to avoid pool_timeout stalls
+        .request(HTTPXRequest(
+            connection_pool_size=32,
+            pool_timeout=10,
+            connect_timeout=5,
+            read_timeout=30,
+            write_timeout=30,
+        ))
+        # getUpdates long-polls on its own connection so it never waits for the shared pool
+        .get_updates_request(HTTPXRequest(connection_pool_size=1, connect_timeout=5, read_timeout=40))
+        # Keep outgoing requests within Telegram's global limit of ~30 msg/s,
+        # retrying calls that still hit flood control
+        .rate_limiter(AIORateLimiter(overall_max_rate=30, overall_time_period=1, max_retries=3))
         .post_init(post_init)
-        .build()
+        .post_shutdown(post_shutdown)
     )
+    if settings.persistence_file:
+        # Flushed every 30s and on shutdown
+        builder.persistence(PicklePersistence(filepath=settings.persistence_file, update_interval=30))
+    app = builder.build()
 
     # Register handlers
     register_common_handlers(app)
@@ -79,8 +112,18 @@ def main() -> None:
     # Set up scheduled reminders
     setup_scheduler(app)
 
-    logger.info("Bot is ready, starting polling...")
-    app.run_polling()
+    if settings.webhook_url:
+        logger.info("Bot is ready, starting webhook...")
+        app.run_webhook(
+            listen="0.0.0.0",
+            port=settings.webhook_port,
+            url_path="telegram",
+            webhook_url=f"{settings.webhook_url.rstrip('/')}/telegram",
+            secret_token=settings.webhook_secret_token or None,
+        )
+    else:
+        logger.info("Bot is ready, starting polling...")
+        app.run_polling()
 
 
 if __name__ == "__main__":
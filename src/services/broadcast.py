@@ -0,0 +1,93 @@
+import asyncio
+import logging
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from aiolimiter import AsyncLimiter
+from telegram import Bot, Message
+from telegram.error import BadRequest, Forbidden, TelegramError
+
+logger = logging.getLogger(__name__)
+
+# bot_data key for the set of chat ids that blocked the bot
+BLOCKED_CHATS_KEY = "blocked_chats"
+
+
+class BroadcastService:
+    """Service for sending messages to many chats concurrently.
+
+    A shared semaphore bounds in-flight sends across all broadcasts, and
+    messages to the same chat are paced to Telegram's 1 msg/s per chat.
+    The global 30 msg/s limit is enforced by the application's AIORateLimiter.
+    """
+
+    # Max concurrent send_message calls (Telegram allows ~30 msg/s per bot).
+    # Keep below the bot's HTTPXRequest connection_pool_size (see main.py).
+    MAX_CONCURRENT_SENDS = 25
+    # Per-chat limit: messages per period (seconds)
+    PER_CHAT_RATE = 1
+    PER_CHAT_PERIOD = 1
+
+    def __init__(self):
+        self._semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_SENDS)
+        self._chat_limiters: Dict[int, AsyncLimiter] = {}
+
+    def _get_chat_limiter(self, chat_id: int) -> AsyncLimiter:
+        limiter = self._chat_limiters.get(chat_id)
+        if limiter is None:
+            limiter = AsyncLimiter(self.PER_CHAT_RATE, self.PER_CHAT_PERIOD)
+            self._chat_limiters[chat_id] = limiter
+        return limiter
+
+    async def send(self, bot: Bot, chat_id: int, text: str, parse_mode: str = "Markdown") -> Message:
+        """Send one rate-limited message. Telegram errors are propagated."""
+        # Wait for the chat's slot before taking a concurrency slot
+        async with self._get_chat_limiter(chat_id), self._semaphore:
+            return await bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode)
+
+    async def _send(
+        self, bot: Bot, chat_id: int, text: str, parse_mode: str, blocked: Set[int]
+    ) -> bool:
+        """Send one message, returning True on success.
+
+        Nothing is retried here: the application's AIORateLimiter already
+        retries flood control (RetryAfter), and a timed-out send may have been
+        delivered. Chats answering Forbidden are added to `blocked`.
+        """
+        try:
+            await self.send(bot, chat_id, text, parse_mode)
+            return True
+        except Forbidden as e:
+            blocked.add(chat_id)
+            logger.info("Chat %s blocked the bot: %s", chat_id, e)
+        except BadRequest as e:
+            logger.info("Cannot send message to %s: %s", chat_id, e)
+        except TelegramError as e:
+            logger.warning("Failed to send message to %s: %s", chat_id, e)
+        return False
+
+    async def send_all(
+        self,
+        bot: Bot,
+        messages: Iterable[Tuple[int, str]],
+        parse_mode: str = "Markdown",
+        blocked: Optional[Set[int]] = None,
+    ) -> Tuple[int, int]:
+        """Send (chat_id, text) messages concurrently.
+
+        Chats in `blocked` are skipped without an API call and counted as
+        failed; chats that turn out to have blocked the bot are added to it.
+        Returns (sent, failed) counts.
+        """
+        if blocked is None:
+            blocked = set()
+
+        messages = list(messages)
+        targets = [(chat_id, text) for chat_id, text in messages if chat_id not in blocked]
+        results = await asyncio.gather(
+            *(self._send(bot, chat_id, text, parse_mode, blocked) for chat_id, text in targets)
+        )
+        sent = sum(results)
+        return sent, len(messages) - sent
+
+
+broadcast_service = BroadcastService()
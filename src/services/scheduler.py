@@ -1,23 +1,44 @@
+import asyncio
 import logging
 from datetime import datetime, time
+from typing import Dict, List, Tuple
 
-from telegram.ext import Application
+from telegram.ext import Application, ContextTypes
 
+from src.bot.templates import (
+    render_invoices_notification,
+    render_scheduled_payment_reminder,
+    render_scheduled_readings_reminder,
+)
+from src.config import settings
+from src.services.broadcast import BLOCKED_CHATS_KEY, broadcast_service
 from src.services.sheets import sheets_service
 
 logger = logging.getLogger(__name__)
 
+# Days of month when scheduled payment reminders are sent
+PAYMENT_REMINDER_DAYS = {1, 5}
+
+# bot_data key for (responsible_id, premise_id, amount) -> time of the last
+# invoice notification, so a failed need_push reset doesn't re-send it
+RECENT_INVOICE_PUSHES_KEY = "recent_invoice_pushes"
+# How long an invoice notification is not repeated (seconds)
+INVOICE_PUSH_DEDUP_TTL = 24 * 3600
+# Daily jobs still run if the event loop was busy at the scheduled time
+# (APScheduler's default grace time is 1 second)
+DAILY_JOB_KWARGS = {"misfire_grace_time": 3600, "coalesce": True}
+
 
 async def send_readings_reminders(app: Application) -> None:
     """Send reminders to tenants who haven't submitted readings this month."""
     logger.info("Running scheduled readings reminder")
 
     # Check if we're in the reminder period (15-20)
-    today = datetime.now().day
+    today = datetime.now(settings.tzinfo).day
     start_day, end_day = await sheets_service.get_readings_period()
 
     if not (start_day <= today <= end_day):
-        logger.info(f"Today ({today}) is not in reminder period ({start_day}-{end_day})")
+        logger.info("Today (%s) is not in reminder period (%s-%s)", today, start_day, end_day)
         return
 
     tenants = await sheets_service.get_tenants_without_readings()
@@ -26,40 +47,38 @@ async def send_readings_reminders(app: Application) -> None:
         logger.info("All tenants have submitted readings")
         return
 
-    for tenant in tenants:
-        tid = tenant.get("telegram_id")
-        meters = tenant.get("meters", [])
-
-        try:
-            meters_text = ", ".join(meters) if meters else "Ваши счётчики"
+    messages = [
+        (tenant.get("telegram_id"), render_scheduled_readings_reminder(tenant.get("meters", [])))
+        for tenant in tenants
+    ]
 
-            await app.bot.send_message(
-                chat_id=tid,
-                text=(
-                    f"📊 *Напоминание о показаниях*\n\n"
-                    f"Пожалуйста, не забудьте сдать показания счётчиков.\n\n"
-                    f"📟 Ожидаем показания: {meters_text}\n\n"
-                    "Нажмите кнопку «📊 Сдать показания» в меню бота."
-                ),
-                parse_mode="Markdown"
-            )
-            logger.info(f"Sent readings reminder to {tid}")
-
-        except Exception as e:
-            logger.error(f"Failed to send readings reminder to {tid}: {e}")
+    sent, failed = await broadcast_service.send_all(
+        app.bot, messages, blocked=app.bot_data.setdefault(BLOCKED_CHATS_KEY, set())
+    )
+    logger.info("Readings reminders: sent %s, failed %s", sent, failed)
 
 
 async def process_invoice_push_notifications(app: Application) -> None:
     """Check for invoices needing push notification and send them."""
     logger.debug("Checking for invoice push notifications")
 
-    invoices = await sheets_service.get_invoices_needing_push()
+    # Both reads are usually cache hits; on a cold cache they overlap
+    invoices, payment_details = await asyncio.gather(
+        sheets_service.get_invoices_needing_push(),
+        sheets_service.get_payment_details(),
+    )
 
     if not invoices:
         return
 
-    payment_details = await sheets_service.get_payment_details()
+    # Drop expired dedup entries
+    now = datetime.now().timestamp()
+    recent = app.bot_data.setdefault(RECENT_INVOICE_PUSHES_KEY, {})
+    for key in [k for k, sent_at in recent.items() if now - sent_at >= INVOICE_PUSH_DEDUP_TTL]:
+        del recent[key]
 
+    # Group by payer so someone paying for several premises gets one message
+    by_payer: Dict[int, List[Tuple[str, float, List[Dict]]]] = {}
     for invoice in invoices:
         premise_id = invoice.get("помещение_id")
         premise_name = invoice.get("Помещение", "")
@@ -67,85 +86,74 @@ async def process_invoice_push_notifications(app: Application) -> None:
         amount = invoice.get("Сумма", 0) or 0
 
         if not responsible_id:
-            logger.warning(f"No responsible_id for premise {premise_id}")
-            await sheets_service.clear_need_push(premise_id)
+            logger.warning("No responsible_id for premise %s", premise_id)
             continue
 
+        key = (str(responsible_id), str(premise_id), amount)
+        if key in recent:
+            logger.info("Invoice notification for premise %s already sent, skipping", premise_id)
+            continue
+        recent[key] = now
+
         # Get meters breakdown for this user
-        meters = await sheets_service.get_meters_by_premise(premise_id)
-        breakdown_lines = []
-        for meter in meters:
-            if str(meter.get("ответственный_оплата")) != str(responsible_id):
-                continue
-            meter_name = meter.get("Название", "")
-            consumption = meter.get("Расход к оплате", 0) or 0
-            unit = meter.get("Единица", "")
-            tariff = meter.get("Тариф", 0) or 0
-            if consumption > 0:
-                breakdown_lines.append(f"   📟 {meter_name}: {consumption:.2f} {unit} × {tariff:.2f} руб.")
-
-        breakdown = "\n".join(breakdown_lines) if breakdown_lines else ""
-        breakdown_section = f"\n📊 *Детализация:*\n{breakdown}\n" if breakdown else ""
-
-        try:
-            await app.bot.send_message(
-                chat_id=responsible_id,
-                text=(
-                    f"📨 *Вам выставлен счёт на оплату!*\n\n"
-                    f"🏠 Помещение: {premise_name}\n"
-                    f"💰 Сумма: *{amount:.0f} руб.*\n"
-                    f"{breakdown_section}\n"
-                    f"🏦 *Реквизиты для оплаты:*\n`{payment_details}`\n\n"
-                    "📸 После оплаты, пожалуйста, отправьте фото чека через бот.\n\n"
-                    "Нажмите кнопку «💳 Мои счета» в меню."
-                ),
-                parse_mode="Markdown"
-            )
-            logger.info(f"Sent invoice notification to {responsible_id} for premise {premise_id}")
-
-        except Exception as e:
-            logger.error(f"Failed to send invoice notification to {responsible_id}: {e}")
-
-        # Clear the flag regardless of success (to avoid spam on errors)
-        await sheets_service.clear_need_push(premise_id)
+        meters = await sheets_service.get_meters_by_premise_and_responsible(premise_id, responsible_id)
+        by_payer.setdefault(responsible_id, []).append((premise_name, amount, meters))
+
+    messages = [
+        (responsible_id, render_invoices_notification(payer_invoices, payment_details))
+        for responsible_id, payer_invoices in by_payer.items()
+    ]
+
+    sent, failed = await broadcast_service.send_all(
+        app.bot, messages, blocked=app.bot_data.setdefault(BLOCKED_CHATS_KEY, set())
+    )
+    logger.info("Invoice notifications: sent %s, failed %s", sent, failed)
+
+    # Clear the flags regardless of success (to avoid spam on errors)
+    await sheets_service.clear_need_push_bulk([invoice.get("помещение_id") for invoice in invoices])
 
 
 async def send_payment_reminders(app: Application) -> None:
     """Send reminders to tenants with unpaid invoices."""
     logger.info("Running scheduled payment reminder")
 
-    tenants = await sheets_service.get_tenants_with_unpaid()
+    tenants, payment_details = await asyncio.gather(
+        sheets_service.get_tenants_with_unpaid(),
+        sheets_service.get_payment_details(),
+    )
 
     if not tenants:
         logger.info("No unpaid invoices")
         return
 
-    payment_details = await sheets_service.get_payment_details()
+    messages = [
+        (
+            tenant.get("telegram_id"),
+            render_scheduled_payment_reminder(
+                tenant.get("total", 0), tenant.get("premises", []), payment_details
+            ),
+        )
+        for tenant in tenants
+    ]
+
+    sent, failed = await broadcast_service.send_all(
+        app.bot, messages, blocked=app.bot_data.setdefault(BLOCKED_CHATS_KEY, set())
+    )
+    logger.info("Payment reminders: sent %s, failed %s", sent, failed)
+
+
+async def _invoice_push_job(context: ContextTypes.DEFAULT_TYPE) -> None:
+    await process_invoice_push_notifications(context.application)
 
-    for tenant in tenants:
-        tid = tenant.get("telegram_id")
-        total = tenant.get("total", 0)
-        premises = tenant.get("premises", [])
 
-        try:
-            premises_text = ", ".join(premises) if premises else ""
+async def _readings_reminder_job(context: ContextTypes.DEFAULT_TYPE) -> None:
+    await send_readings_reminders(context.application)
 
-            await app.bot.send_message(
-                chat_id=tid,
-                text=(
-                    f"💳 *Напоминание об оплате*\n\n"
-                    f"💰 К оплате: *{total:.0f} руб.*"
-                    + (f"\n🏠 Помещения: {premises_text}" if premises_text else "") + "\n\n"
-                    f"🏦 *Реквизиты:*\n`{payment_details}`\n\n"
-                    "📸 После оплаты, пожалуйста, отправьте фото чека через бот.\n\n"
-                    "Нажмите кнопку «💳 Мои счета» в меню."
-                ),
-                parse_mode="Markdown"
-            )
-            logger.info(f"Sent payment reminder to {tid}")
 
-        except Exception as e:
-            logger.error(f"Failed to send payment reminder to {tid}: {e}")
+async def _payment_reminder_job(context: ContextTypes.DEFAULT_TYPE) -> None:
+    if datetime.now(settings.tzinfo).day not in PAYMENT_REMINDER_DAYS:
+        return
+    await send_payment_reminders(context.application)
 
 
 def setup_scheduler(app: Application) -> None:
@@ -158,7 +166,7 @@ def setup_scheduler(app: Application) -> None:
 
     # Check for invoice push notifications every 5 minutes
     job_queue.run_repeating(
-        lambda ctx: process_invoice_push_notifications(app),
+        _invoice_push_job,
         interval=300,  # every 5 minutes
         first=30,  # start after 30 seconds
         name="invoice_push_check",
@@ -166,24 +174,18 @@ def setup_scheduler(app: Application) -> None:
 
     # Send readings reminders daily at 10:00 (during the period 15-20)
     job_queue.run_daily(
-        lambda ctx: send_readings_reminders(app),
+        _readings_reminder_job,
         time=time(hour=10, minute=0),
         name="readings_reminder",
+        job_kwargs=DAILY_JOB_KWARGS,
     )
 
-    # Send payment reminders on 1st and 5th of each month at 10:00
-    job_queue.run_monthly(
-        lambda ctx: send_payment_reminders(app),
-        when=time(hour=10, minute=0),
-        day=1,
-        name="payment_reminder_1",
-    )
-
-    job_queue.run_monthly(
-        lambda ctx: send_payment_reminders(app),
-        when=time(hour=10, minute=0),
-        day=5,
-        name="payment_reminder_5",
+    # Send payment reminders on PAYMENT_REMINDER_DAYS (1st and 5th) at 10:00
+    job_queue.run_daily(
+        _payment_reminder_job,
+        time=time(hour=10, minute=0),
+        name="payment_reminder",
+        job_kwargs=DAILY_JOB_KWARGS,
     )
 
     logger.info("Scheduler jobs configured")
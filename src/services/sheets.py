@@ -1,16 +1,38 @@
 from __future__ import annotations
 
 import asyncio
+import logging
+import random
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from functools import partial
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Tuple
 
 import gspread
+from aiolimiter import AsyncLimiter
 from google.oauth2.service_account import Credentials
 
 from src.config import settings
 
+logger = logging.getLogger(__name__)
+
+
+def _values_to_records(values: List[List[Any]]) -> List[Dict]:
+    """Turn a values range (header row first) into records like get_all_records()."""
+    if not values or values == [[]]:
+        return []
+    values = gspread.utils.fill_gaps(values)
+    headers, rows = values[0], values[1:]
+    return gspread.utils.to_records(headers, [gspread.utils.numericise_all(row) for row in rows])
+
+
+def _cell_data(value: Any) -> Dict[str, Any]:
+    """CellData for a raw value, as written with valueInputOption=RAW."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {"userEnteredValue": {"numberValue": value}}
+    return {"userEnteredValue": {"stringValue": str(value)}}
+
 
 class SheetsService:
     """Service for interacting with Google Sheets.
@@ -28,25 +50,253 @@ class SheetsService:
     CACHE_TTL = 120
     # Headers cache TTL (10 minutes - headers change rarely)
     HEADERS_CACHE_TTL = 600
+    # Settings cache TTL (10 minutes - payment details etc. are edited by hand)
+    SETTINGS_CACHE_TTL = 600
+    # Tenants cache TTL (10 minutes - add_tenant invalidates it on writes)
+    TENANTS_CACHE_TTL = 600
+    # Premises and tariffs TTL (30 minutes - they change a few times a year,
+    # and the bot's own add_premise/update_tariff keep the cache in sync)
+    REFERENCE_CACHE_TTL = 1800
+    # Readings and invoices TTL (1 minute - formulas and hand edits change them often)
+    HOT_CACHE_TTL = 60
+    # How long one spreadsheet revision check is reused for other expired entries
+    REVISION_CHECK_TTL = 10
+    # Allowed clock difference with Google when comparing modifiedTime to load times
+    REVISION_CLOCK_MARGIN = 5
+    # Max requests sent in one spreadsheets.batchUpdate call
+    MAX_WRITE_BATCH = 50
+    # Worker threads for gspread calls - more threads only burn API quota faster
+    MAX_WORKERS = 4
+    # Write requests per minute (Sheets allows 60 per minute per user)
+    WRITES_PER_MINUTE = 55
+    # Retries of rate-limited (429) or failed (5xx) requests. Backoff doubles
+    # from 1s, so a request gives up after ~15s of waiting
+    MAX_RETRIES = 4
+    RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
 
     def __init__(self):
         self._client: Optional[gspread.Client] = None
         self._spreadsheet: Optional[gspread.Spreadsheet] = None
+        self._worksheets: Dict[str, gspread.Worksheet] = {}
         self._cache: Dict[str, Dict[str, Any]] = {}
         self._headers_cache: Dict[str, Dict[str, Any]] = {}
+        self._fetch_locks: Dict[str, asyncio.Lock] = {}
+        # Per-sheet locks held from computing a new id until its row is appended
+        self._add_locks: Dict[str, asyncio.Lock] = {}
+        # Derived key -> (source list it was built from, derived value)
+        self._derived: Dict[str, Tuple[Any, Any]] = {}
+        # (start time, spreadsheet modifiedTime) of the last revision check
+        self._revision: Optional[Tuple[float, str]] = None
+        self._revision_lock = asyncio.Lock()
+        self._pending_writes: List[Tuple[List[Dict[str, Any]], asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._executor = ThreadPoolExecutor(max_workers=self.MAX_WORKERS, thread_name_prefix="sheets")
+        self._write_limiter = AsyncLimiter(self.WRITES_PER_MINUTE, 60)
+        # Cache key -> (worksheet title, records parser or None, TTL or None for default)
+        self._sheet_sources: Dict[str, Tuple[str, Optional[Callable[[List[Dict]], Any]], Optional[float]]] = {
+            "premises": ("Помещения", None, self.REFERENCE_CACHE_TTL),
+            "tenants_raw": ("Арендаторы", self._parse_tenants, self.TENANTS_CACHE_TTL),
+            "meters": ("Счетчики", self._with_row_numbers, None),
+            "readings": ("Показания", None, self.HOT_CACHE_TTL),
+            "invoices": ("Счета", self._parse_invoices, self.HOT_CACHE_TTL),
+            "settings": ("Настройки", self._parse_settings, self.SETTINGS_CACHE_TTL),
+            "tariffs": ("Тарифы", self._parse_tariffs, self.REFERENCE_CACHE_TTL),
+        }
 
     def _get_cached(self, key: str) -> Optional[Any]:
-        """Get value from cache if not expired."""
-        if key in self._cache:
-            entry = self._cache[key]
-            if time.time() - entry["time"] < self.CACHE_TTL:
-                return entry["data"]
-            del self._cache[key]
+        """Get value from cache if not expired.
+
+        Expired entries are kept until replaced, so _get_or_fetch can
+        revalidate them against the spreadsheet revision.
+        """
+        entry = self._cache.get(key)
+        if entry is not None and time.time() - entry["time"] < entry.get("ttl", self.CACHE_TTL):
+            return entry["data"]
         return None
 
-    def _set_cached(self, key: str, data: Any) -> None:
-        """Set value in cache with current timestamp."""
-        self._cache[key] = {"data": data, "time": time.time()}
+    def _set_cached(
+        self,
+        key: str,
+        data: Any,
+        ttl: Optional[float] = None,
+        revision: Optional[str] = None,
+        loaded_at: Optional[float] = None,
+    ) -> None:
+        """Set value in cache with current timestamp and optional custom TTL.
+
+        `revision` is the spreadsheet revision read before the data was
+        fetched, if one was read; `loaded_at` is when the fetch started.
+        """
+        now = time.time()
+        self._cache[key] = {
+            "data": data,
+            "time": now,
+            "ttl": ttl or self.CACHE_TTL,
+            "revision": revision,
+            "loaded_at": loaded_at or now,
+        }
+
+    def _is_current(self, entry: Dict[str, Any], revision: Optional[str]) -> bool:
+        """Check whether a cache entry still matches the spreadsheet revision.
+
+        It does if it was loaded at that revision, or if the spreadsheet was
+        last modified before the entry's load started.
+        """
+        if revision is None:
+            return False
+        if entry.get("revision") == revision:
+            return True
+        modified = datetime.fromisoformat(revision.replace("Z", "+00:00")).timestamp()
+        return modified < entry["loaded_at"] - self.REVISION_CLOCK_MARGIN
+
+    async def _get_revision(self, force: bool = False) -> Optional[str]:
+        """Get the spreadsheet's Drive modifiedTime (one check per REVISION_CHECK_TTL).
+
+        `force` skips the reuse window but still accepts a check that started
+        after the call, so concurrent forced callers share one request.
+        Returns None if it can't be read; callers then just reload.
+        """
+        called_at = time.time()
+        async with self._revision_lock:
+            if self._revision is not None:
+                checked_at, revision = self._revision
+                if checked_at >= called_at or (
+                    not force and time.time() - checked_at < self.REVISION_CHECK_TTL
+                ):
+                    return revision
+            checked_at = time.time()
+            try:
+                revision = await self._run_sync(self._get_spreadsheet().get_lastUpdateTime)
+            except Exception as e:
+                logger.warning("Failed to get spreadsheet revision: %s", e)
+                return None
+            self._revision = (checked_at, revision)
+            return revision
+
+    async def _ensure_fresh(self, *keys: str) -> None:
+        """Drop cached `keys` if the spreadsheet changed since they were loaded.
+
+        Called before writes that take row numbers, ids or formula values
+        from the cache, which may be up to a TTL old: one forced Drive
+        metadata call makes them reload after a manual edit.
+        """
+        cached = [key for key in keys if key in self._cache]
+        if not cached:
+            return
+        revision = await self._get_revision(force=True)
+        for key in cached:
+            entry = self._cache.get(key)
+            if entry is not None and not self._is_current(entry, revision):
+                del self._cache[key]
+
+    def _append_cached(self, key: str, record: Dict) -> None:
+        """Add a record the bot just appended to a cached list, if it is cached.
+
+        A new list is stored (callers may hold or memoize the old one, and
+        derived indexes are rebuilt when the list changes) and the
+        entry keeps its original timestamps, so it still expires on schedule
+        and is then reloaded (the append modified the sheet after its load).
+        """
+        entry = self._cache.get(key)
+        if entry is not None:
+            entry["data"] = entry["data"] + [record]
+            entry["revision"] = None
+
+    async def _get_or_fetch(self, key: str, fetch, ttl: Optional[float] = None) -> Any:
+        """Return cached value or load it once via async fetch().
+
+        Concurrent callers for the same key wait on a per-key lock, so a
+        cold cache triggers a single Sheets request instead of one per caller.
+        An expired sheet entry is kept for another TTL if the spreadsheet
+        hasn't been modified since it was loaded; the bot's own writes invalidate
+        the entries they touch, so this only has to catch manual edits.
+        """
+        cached = self._get_cached(key)
+        if cached is not None:
+            return cached
+
+        lock = self._fetch_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            cached = self._get_cached(key)
+            if cached is not None:
+                return cached
+            # Only an expired entry is revalidated; a cold miss (e.g. after the
+            # bot's own write invalidated it) goes straight to the sheet
+            revision = None
+            entry = self._cache.get(key)
+            if entry is not None:
+                revision = await self._get_revision()
+                if self._is_current(entry, revision):
+                    entry["time"] = time.time()
+                    return entry["data"]
+            loaded_at = time.time()
+            result = await fetch()
+            self._set_cached(key, result, ttl, revision, loaded_at)
+            return result
+
+    async def _get_derived(self, key: str, load, build: Callable[[Any], Any]) -> Any:
+        """Get build(load()), rebuilt whenever load() returns a different list.
+
+        The cache returns the same list object until its entry is reloaded
+        or invalidated, so the list identity serves as the version (as in
+        owner._get_rendered_pages): a derived value never outlives its source.
+        """
+        source = await load()
+        cached = self._derived.get(key)
+        if cached is not None and cached[0] is source:
+            return cached[1]
+        value = build(source)
+        self._derived[key] = (source, value)
+        return value
+
+    async def _get_index(self, source_key: str, load, col: str, grouped: bool = False) -> Dict[str, Any]:
+        """Index a cached record list by str(record[col]).
+
+        Unique indexes keep the first matching record; grouped ones map
+        each value to a list of records.
+        """
+        def _build(records):
+            if not grouped:
+                return {str(r.get(col)): r for r in reversed(records)}
+            index: Dict[str, List[Dict]] = {}
+            for r in records:
+                index.setdefault(str(r.get(col)), []).append(r)
+            return index
+
+        return await self._get_derived(f"{source_key}_by_{col}", load, _build)
+
+    async def _load_sheet(self, key: str) -> Any:
+        """Get a whole sheet's parsed records by cache key (cached)."""
+        title, parse, ttl = self._sheet_sources[key]
+
+        def _get():
+            # One values.get call: worksheet() would cost an extra metadata request
+            response = self._get_spreadsheet().values_get(f"'{title}'")
+            records = _values_to_records(response.get("values", []))
+            return parse(records) if parse else records
+
+        return await self._get_or_fetch(key, lambda: self._run_sync(_get), ttl)
+
+    async def _prefetch(self, keys: List[str]) -> None:
+        """Load the uncached sheets among `keys` with a single values.batchGet call."""
+        missing = [key for key in keys if self._get_cached(key) is None]
+        if not missing:
+            return
+
+        def _get():
+            ranges = [f"'{self._sheet_sources[key][0]}'" for key in missing]
+            response = self._get_spreadsheet().values_batch_get(ranges)
+            return [value_range.get("values", []) for value_range in response.get("valueRanges", [])]
+
+        loaded_at = time.time()
+        for key, values in zip(missing, await self._run_sync(_get)):
+            _, parse, ttl = self._sheet_sources[key]
+            records = _values_to_records(values)
+            self._set_cached(key, parse(records) if parse else records, ttl, loaded_at=loaded_at)
+
+    async def warm_up(self) -> None:
+        """Preload all sheets into the cache in one request."""
+        await self._prefetch(list(self._sheet_sources))
 
     def invalidate_cache(self, pattern: Optional[str] = None) -> None:
         """Invalidate cache entries.
@@ -56,6 +306,7 @@ class SheetsService:
         """
         if pattern is None:
             self._cache.clear()
+            self._derived.clear()
         else:
             keys_to_delete = [k for k in self._cache if pattern in k]
             for k in keys_to_delete:
@@ -87,25 +338,6 @@ class SheetsService:
         except ValueError:
             raise ValueError(f"Column '{col_name}' not found in sheet '{sheet.title}'. Available: {headers}")
 
-    def _get_col_letter(self, sheet: gspread.Worksheet, col_name: str) -> str:
-        """Get column letter (A, B, C, ..., AA, AB, ...) by column name."""
-        col_index = self._get_col_index(sheet, col_name)
-        return gspread.utils.rowcol_to_a1(1, col_index)[:-1]  # Remove row number
-
-    def _get_range_by_names(self, sheet: gspread.Worksheet, row: int, col_names: List[str]) -> str:
-        """Get A1 range notation for a row spanning multiple columns by names.
-
-        Example: row=5, col_names=["Последнее показание", "Дата посл. показания"]
-        Returns: "L5:M5" (or whatever columns those are)
-        """
-        if len(col_names) == 1:
-            letter = self._get_col_letter(sheet, col_names[0])
-            return f"{letter}{row}"
-        else:
-            first_letter = self._get_col_letter(sheet, col_names[0])
-            last_letter = self._get_col_letter(sheet, col_names[-1])
-            return f"{first_letter}{row}:{last_letter}{row}"
-
     def _get_client(self) -> gspread.Client:
         if self._client is None:
             creds = Credentials.from_service_account_info(
@@ -120,10 +352,159 @@ class SheetsService:
             self._spreadsheet = client.open_by_key(settings.google_sheets_id)
         return self._spreadsheet
 
+    def _get_worksheet(self, title: str) -> gspread.Worksheet:
+        """Get a worksheet handle by title (cached).
+
+        Spreadsheet.worksheet() fetches the spreadsheet metadata on every
+        call; writers only need the sheet id, which doesn't change.
+        """
+        sheet = self._worksheets.get(title)
+        if sheet is None:
+            sheet = self._worksheets[title] = self._get_spreadsheet().worksheet(title)
+        return sheet
+
+    async def _run_with_backoff(self, retry_status_codes, func, *args, **kwargs):
+        """Run a synchronous gspread call in the service's executor.
+
+        API errors with a status in `retry_status_codes` are retried up to
+        MAX_RETRIES times with exponential backoff and jitter.
+        """
+        loop = asyncio.get_running_loop()
+        if kwargs:
+            func = partial(func, **kwargs)
+        for attempt in range(self.MAX_RETRIES + 1):
+            try:
+                return await loop.run_in_executor(self._executor, func, *args)
+            except gspread.exceptions.APIError as e:
+                if attempt == self.MAX_RETRIES or e.code not in retry_status_codes:
+                    raise
+                delay = 2 ** attempt + random.random()
+                logger.warning("Sheets API error %s, retrying in %.1fs: %s", e.code, delay, e)
+                await asyncio.sleep(delay)
+
     async def _run_sync(self, func, *args, **kwargs):
-        """Run synchronous gspread calls in executor."""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, partial(func, *args, **kwargs))
+        """Run synchronous gspread calls in executor, retrying 429 and 5xx errors."""
+        return await self._run_with_backoff(self.RETRY_STATUS_CODES, func, *args, **kwargs)
+
+    async def _run_write(self, func, *args, **kwargs):
+        """Run a synchronous gspread write, paced to the write quota.
+
+        Reads are not limited, so they never queue behind writes. Only 429s
+        are retried: a rejected request wasn't applied, while an append
+        that failed with a 5xx may already have added its row.
+        """
+        async with self._write_limiter:
+            try:
+                return await self._run_with_backoff({429}, func, *args, **kwargs)
+            except Exception:
+                # A sheet may have been deleted and recreated with a new id
+                self._worksheets.clear()
+                raise
+
+    async def _write_requests(self, requests: List[Dict[str, Any]]) -> None:
+        """Send spreadsheets.batchUpdate requests, batching with concurrent writes.
+
+        The first write is sent right away; writes queued while a batch is in
+        flight go out together in the next batchUpdate call, so bursts cost
+        one request instead of one per write without delaying single ones.
+        A caller's requests always go out in the same call.
+        """
+        if not requests:
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._pending_writes.append((requests, future))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_writes())
+        await future
+
+    def _cell_requests(
+        self, sheet_title: str, cells: List[Tuple[int, List[str], List[Any]]]
+    ) -> List[Dict[str, Any]]:
+        """Resolve (row, column names, row values) into updateCells requests.
+
+        Values start at the first named column. Rows come from the cached
+        records ("_row"), so writers don't re-read the whole sheet just to
+        find where to write.
+        """
+        if not cells:
+            return []
+        sheet = self._get_worksheet(sheet_title)
+        return [
+            {
+                "updateCells": {
+                    "start": {
+                        "sheetId": sheet.id,
+                        "rowIndex": row - 1,
+                        "columnIndex": self._get_col_index(sheet, col_names[0]) - 1,
+                    },
+                    "rows": [{"values": [_cell_data(value) for value in values]}],
+                    "fields": "userEnteredValue",
+                }
+            }
+            for row, col_names, values in cells
+        ]
+
+    def _append_request(self, sheet_title: str, row: List[Any]) -> Dict[str, Any]:
+        """Build an appendCells request adding `row` after the sheet's last row."""
+        sheet = self._get_worksheet(sheet_title)
+        return {
+            "appendCells": {
+                "sheetId": sheet.id,
+                "rows": [{"values": [_cell_data(value) for value in row]}],
+                "fields": "userEnteredValue",
+            }
+        }
+
+    async def _flush_writes(self) -> None:
+        """Send queued writes in spreadsheets.batchUpdate calls until the queue is empty."""
+        while self._pending_writes:
+            # Take whole callers' writes, up to MAX_WRITE_BATCH requests (at least one caller)
+            count, size = 0, 0
+            for requests, _ in self._pending_writes:
+                if count and size + len(requests) > self.MAX_WRITE_BATCH:
+                    break
+                count += 1
+                size += len(requests)
+            batch = self._pending_writes[:count]
+            del self._pending_writes[:count]
+            body = {"requests": [request for requests, _ in batch for request in requests]}
+            try:
+                await self._run_write(self._get_spreadsheet().batch_update, body)
+            except gspread.exceptions.APIError as e:
+                if len(batch) > 1 and 400 <= e.code < 500 and e.code != 429:
+                    # batchUpdate is all-or-nothing and nothing was applied:
+                    # resend each caller's writes so only the bad ones fail
+                    await self._resend_writes(batch)
+                else:
+                    self._fail_writes(batch, e)
+            except Exception as e:
+                self._fail_writes(batch, e)
+            else:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_result(None)
+
+    async def _resend_writes(self, batch: List[Tuple[List[Dict[str, Any]], asyncio.Future]]) -> None:
+        """Send each caller's writes from a rejected batch in its own batchUpdate call."""
+        for requests, future in batch:
+            try:
+                await self._run_write(self._get_spreadsheet().batch_update, {"requests": requests})
+            except Exception as e:
+                self._fail_writes([(requests, future)], e)
+            else:
+                if not future.done():
+                    future.set_result(None)
+
+    def _fail_writes(self, batch: List[Tuple[List[Dict[str, Any]], asyncio.Future]], error: Exception) -> None:
+        """Pass a failed batchUpdate's error to the callers waiting on it."""
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    async def flush_writes(self) -> None:
+        """Wait for queued writes to be sent (call on shutdown)."""
+        if self._flush_task is not None:
+            await self._flush_task
 
     def _is_true(self, value) -> bool:
         """Check if value is truthy (TRUE, True, true, 1, etc)."""
@@ -140,87 +521,82 @@ class SheetsService:
 
     async def get_all_premises(self) -> List[Dict]:
         """Get all premises (cached)."""
-        cached = self._get_cached("premises")
-        if cached is not None:
-            return cached
-
-        def _get():
-            sheet = self._get_spreadsheet().worksheet("Помещения")
-            return sheet.get_all_records()
-
-        result = await self._run_sync(_get)
-        self._set_cached("premises", result)
-        return result
+        return await self._load_sheet("premises")
 
     async def get_premise(self, premise_id: int) -> Optional[Dict]:
         """Get premise by id (uses cached premises)."""
-        premises = await self.get_all_premises()
-        for record in premises:
-            if str(record.get("id")) == str(premise_id):
-                return record
-        return None
+        index = await self._get_index("premises", self.get_all_premises, "id")
+        return index.get(str(premise_id))
 
     async def add_premise(self, name: str, address: str = "") -> int:
         """Add new premise. Returns new id."""
-        def _add():
-            sheet = self._get_spreadsheet().worksheet("Помещения")
-            records = sheet.get_all_records()
-            new_id = max([r.get("id", 0) for r in records], default=0) + 1
-            sheet.append_row([new_id, name, address])
-            return new_id
-
-        result = await self._run_sync(_add)
-        self.invalidate_cache("premises")
-        return result
+        async with self._add_locks.setdefault("premises", asyncio.Lock()):
+            await self._ensure_fresh("premises")
+            premises = await self.get_all_premises()
+            new_id = max([r.get("id", 0) for r in premises], default=0) + 1
+
+            def _add():
+                sheet = self._get_worksheet("Помещения")
+                sheet.append_row([new_id, name, address])
+
+            await self._run_write(_add)
+            self._append_cached("premises", {"id": new_id, "Название": name, "Адрес": address})
+        return new_id
 
     # ============================================================
     # Арендаторы
     # Columns: telegram_id, Имя, Телефон, is_owner
     # ============================================================
 
+    def _parse_tenants(self, records: List[Dict]) -> List[Dict]:
+        """Add a parsed boolean "_is_owner" alongside the raw "is_owner"."""
+        for record in records:
+            record["_is_owner"] = self._is_true(record.get("is_owner"))
+        return records
+
     async def _get_all_tenants_raw(self) -> List[Dict]:
         """Get all tenants including owner (cached)."""
-        cached = self._get_cached("tenants_raw")
-        if cached is not None:
-            return cached
+        return await self._load_sheet("tenants_raw")
 
-        def _get():
-            sheet = self._get_spreadsheet().worksheet("Арендаторы")
-            return sheet.get_all_records()
+    async def _get_tenants_by_id(self) -> Dict[str, Dict]:
+        """Get tenants indexed by str(telegram_id)."""
+        def _build(tenants):
+            return {str(r.get("telegram_id")): r for r in reversed(tenants)}
 
-        result = await self._run_sync(_get)
-        self._set_cached("tenants_raw", result)
-        return result
+        return await self._get_derived("tenants_by_id", self._get_all_tenants_raw, _build)
 
     async def get_tenant(self, telegram_id: int) -> Optional[Dict]:
         """Get tenant by telegram_id (uses cached tenants)."""
-        tenants = await self._get_all_tenants_raw()
-        for record in tenants:
-            if str(record.get("telegram_id")) == str(telegram_id):
-                return record
-        return None
+        tenants_by_id = await self._get_tenants_by_id()
+        return tenants_by_id.get(str(telegram_id))
 
     async def get_all_tenants(self) -> List[Dict]:
         """Get all tenants excluding owner (uses cached tenants)."""
         tenants = await self._get_all_tenants_raw()
-        return [r for r in tenants if not self._is_true(r.get("is_owner"))]
+        return [r for r in tenants if not r["_is_owner"]]
 
     async def get_owner(self) -> Optional[Dict]:
         """Get owner record (uses cached tenants)."""
         tenants = await self._get_all_tenants_raw()
         for record in tenants:
-            if self._is_true(record.get("is_owner")):
+            if record["_is_owner"]:
                 return record
         return None
 
     async def add_tenant(self, telegram_id: int, name: str, phone: str = "") -> None:
         """Add new tenant."""
         def _add():
-            sheet = self._get_spreadsheet().worksheet("Арендаторы")
+            sheet = self._get_worksheet("Арендаторы")
             sheet.append_row([telegram_id, name, phone, "FALSE"])
 
-        await self._run_sync(_add)
-        self.invalidate_cache("tenants")
+        await self._run_write(_add)
+        self._append_cached("tenants_raw", {
+            "telegram_id": telegram_id,
+            "Имя": name,
+            "Телефон": phone,
+            "is_owner": "FALSE",
+            "_is_owner": False,
+        })
 
     # ============================================================
     # Счетчики
@@ -232,48 +608,51 @@ class SheetsService:
     #          Расход к оплате, Сумма к оплате
     # ============================================================
 
-    async def get_all_meters(self) -> List[Dict]:
-        """Get all meters (cached)."""
-        cached = self._get_cached("meters")
-        if cached is not None:
-            return cached
-
-        def _get():
-            sheet = self._get_spreadsheet().worksheet("Счетчики")
-            return sheet.get_all_records()
+    def _with_row_numbers(self, records: List[Dict]) -> List[Dict]:
+        """Add each record's sheet row number as "_row"."""
+        for i, record in enumerate(records, start=2):
+            record["_row"] = i
+        return records
 
-        result = await self._run_sync(_get)
-        self._set_cached("meters", result)
-        return result
+    async def get_all_meters(self) -> List[Dict]:
+        """Get all meters with row numbers (cached)."""
+        return await self._load_sheet("meters")
 
     async def get_meter(self, meter_id: int) -> Optional[Dict]:
         """Get meter by id (uses cached meters)."""
-        meters = await self.get_all_meters()
-        for record in meters:
-            if str(record.get("id")) == str(meter_id):
-                return record
-        return None
+        index = await self._get_index("meters", self.get_all_meters, "id")
+        return index.get(str(meter_id))
 
     async def get_meters_for_readings(self, telegram_id: int) -> List[Dict]:
         """Get meters where user is responsible for readings (uses cached meters)."""
-        meters = await self.get_all_meters()
-        return [
-            r for r in meters
-            if str(r.get("ответственный_показания")) == str(telegram_id)
-        ]
+        index = await self._get_index("meters", self.get_all_meters, "ответственный_показания", grouped=True)
+        return index.get(str(telegram_id), [])
 
     async def get_meters_for_payment(self, telegram_id: int) -> List[Dict]:
         """Get meters where user is responsible for payment (uses cached meters)."""
-        meters = await self.get_all_meters()
-        return [
-            r for r in meters
-            if str(r.get("ответственный_оплата")) == str(telegram_id)
-        ]
+        index = await self._get_index("meters", self.get_all_meters, "ответственный_оплата", grouped=True)
+        return index.get(str(telegram_id), [])
 
     async def get_meters_by_premise(self, premise_id: int) -> List[Dict]:
         """Get all meters for a premise (uses cached meters)."""
-        meters = await self.get_all_meters()
-        return [r for r in meters if str(r.get("помещение_id")) == str(premise_id)]
+        index = await self._get_index("meters", self.get_all_meters, "помещение_id", grouped=True)
+        return index.get(str(premise_id), [])
+
+    async def _get_meters_by_premise_and_payer(self) -> Dict[Tuple[str, str], List[Dict]]:
+        """Get meters indexed by (str(помещение_id), str(ответственный_оплата))."""
+        def _build(meters):
+            index: Dict[Tuple[str, str], List[Dict]] = {}
+            for r in meters:
+                key = (str(r.get("помещение_id")), str(r.get("ответственный_оплата")))
+                index.setdefault(key, []).append(r)
+            return index
+
+        return await self._get_derived("meters_by_premise_payer", self.get_all_meters, _build)
+
+    async def get_meters_by_premise_and_responsible(self, premise_id: int, telegram_id: int) -> List[Dict]:
+        """Get premise meters where user is responsible for payment (uses cached meters)."""
+        index = await self._get_meters_by_premise_and_payer()
+        return index.get((str(premise_id), str(telegram_id)), [])
 
     async def add_meter(
         self,
@@ -292,43 +671,45 @@ class SheetsService:
         Note: Columns Тариф, Расход к оплате, Сумма к оплате are formula-based
         in Google Sheets and should NOT be written by the bot.
         """
-        def _add():
-            sheet = self._get_spreadsheet().worksheet("Счетчики")
-            records = sheet.get_all_records()
-            new_id = max([r.get("id", 0) for r in records], default=0) + 1
-            # Columns: id, помещение_id, Помещение, Название, Тип, Единица, Тариф (формула),
-            #          ответственный_показания, Имя_показания,
-            #          ответственный_оплата, Имя_оплата,
-            #          Последнее показание, Дата посл. показания,
-            #          Оплаченное показание, Дата посл. оплаты,
-            #          Расход к оплате (формула), Сумма к оплате (формула)
-            #
-            # We only write up to column 15 (Дата посл. оплаты).
-            # Columns 7 (Тариф), 16 (Расход к оплате), 17 (Сумма к оплате)
-            # are calculated by formulas in Google Sheets.
-            sheet.append_row([
-                new_id,
-                premise_id,
-                premise_name,
-                name,
-                meter_type,
-                unit,
-                "",  # Тариф - will be filled by formula from Настройки
-                responsible_readings,
-                responsible_readings_name,
-                responsible_payment,
-                responsible_payment_name,
-                0,   # Последнее показание
-                "",  # Дата посл. показания
-                0,   # Оплаченное показание
-                "",  # Дата посл. оплаты
-                # Columns 16-17 (Расход к оплате, Сумма к оплате) - formulas will auto-fill
-            ])
-            return new_id
+        async with self._add_locks.setdefault("meters", asyncio.Lock()):
+            await self._ensure_fresh("meters")
+            meters = await self.get_all_meters()
+            new_id = max([r.get("id", 0) for r in meters], default=0) + 1
+
+            def _add():
+                sheet = self._get_worksheet("Счетчики")
+                # Columns: id, помещение_id, Помещение, Название, Тип, Единица, Тариф (формула),
+                #          ответственный_показания, Имя_показания,
+                #          ответственный_оплата, Имя_оплата,
+                #          Последнее показание, Дата посл. показания,
+                #          Оплаченное показание, Дата посл. оплаты,
+                #          Расход к оплате (формула), Сумма к оплате (формула)
+                #
+                # We only write up to column 15 (Дата посл. оплаты).
+                # Columns 7 (Тариф), 16 (Расход к оплате), 17 (Сумма к оплате)
+                # are calculated by formulas in Google Sheets.
+                sheet.append_row([
+                    new_id,
+                    premise_id,
+                    premise_name,
+                    name,
+                    meter_type,
+                    unit,
+                    "",  # Тариф - will be filled by formula from Настройки
+                    responsible_readings,
+                    responsible_readings_name,
+                    responsible_payment,
+                    responsible_payment_name,
+                    0,   # Последнее показание
+                    "",  # Дата посл. показания
+                    0,   # Оплаченное показание
+                    "",  # Дата посл. оплаты
+                    # Columns 16-17 (Расход к оплате, Сумма к оплате) - formulas will auto-fill
+                ])
 
-        result = await self._run_sync(_add)
-        self.invalidate_cache("meters")
-        return result
+            await self._run_write(_add)
+            self.invalidate_cache("meters")
+        return new_id
 
     async def update_meter_last_reading(self, meter_id: int, reading: float) -> None:
         """Update last reading and date for a meter.
@@ -336,19 +717,20 @@ class SheetsService:
         Note: Columns Расход к оплате and Сумма к оплате are formula-based
         in Google Sheets and recalculate automatically.
         """
-        def _update():
-            sheet = self._get_spreadsheet().worksheet("Счетчики")
-            records = sheet.get_all_records()
-            for i, record in enumerate(records, start=2):
-                if str(record.get("id")) == str(meter_id):
-                    range_addr = self._get_range_by_names(
-                        sheet, i, ["Последнее показание", "Дата посл. показания"]
-                    )
-                    sheet.update(range_addr, [[reading, datetime.now().strftime("%Y-%m-%d")]])
-                    break
-
-        await self._run_sync(_update)
+        await self._ensure_fresh("meters")
+        meter = await self.get_meter(meter_id)
+        if meter is None:
+            return
+
+        writes = await self._run_sync(self._cell_requests, "Счетчики", [(
+            meter["_row"],
+            ["Последнее показание", "Дата посл. показания"],
+            [reading, datetime.now(settings.tzinfo).strftime("%Y-%m-%d")],
+        )])
+        await self._write_requests(writes)
         self.invalidate_cache("meters")
+        # Invoice sums are formulas over meter readings
+        self.invalidate_cache("invoices")
 
     async def update_meter_paid_reading(self, meter_id: int) -> Dict:
         """Mark current reading as paid. Returns meter info with payment amount.
@@ -357,32 +739,26 @@ class SheetsService:
         in Google Sheets. When Оплаченное показание is updated, formulas will
         automatically recalculate to show 0 (or new consumption).
         """
-        def _update():
-            sheet = self._get_spreadsheet().worksheet("Счетчики")
-            records = sheet.get_all_records()
-            for i, record in enumerate(records, start=2):
-                if str(record.get("id")) == str(meter_id):
-                    last_reading = record.get("Последнее показание", 0) or 0
-
-                    # Read current values from formula columns (for return info)
-                    consumption = record.get("Расход к оплате", 0) or 0
-                    amount = record.get("Сумма к оплате", 0) or 0
-
-                    range_addr = self._get_range_by_names(
-                        sheet, i, ["Оплаченное показание", "Дата посл. оплаты"]
-                    )
-                    sheet.update(range_addr, [[last_reading, datetime.now().strftime("%Y-%m-%d")]])
-
-                    return {
-                        "meter": record,
-                        "consumption": consumption,
-                        "amount": amount,
-                    }
+        await self._ensure_fresh("meters")
+        meter = await self.get_meter(meter_id)
+        if meter is None:
             return None
 
-        result = await self._run_sync(_update)
+        writes = await self._run_sync(self._cell_requests, "Счетчики", [(
+            meter["_row"],
+            ["Оплаченное показание", "Дата посл. оплаты"],
+            [meter.get("Последнее показание", 0) or 0, datetime.now(settings.tzinfo).strftime("%Y-%m-%d")],
+        )])
+        await self._write_requests(writes)
         self.invalidate_cache("meters")
-        return result
+        self.invalidate_cache("invoices")
+
+        # Values of the formula columns before the update (for return info)
+        return {
+            "meter": meter,
+            "consumption": meter.get("Расход к оплате", 0) or 0,
+            "amount": meter.get("Сумма к оплате", 0) or 0,
+        }
 
     # ============================================================
     # Показания
@@ -392,28 +768,17 @@ class SheetsService:
 
     async def _get_all_readings(self) -> List[Dict]:
         """Get all readings (cached)."""
-        cached = self._get_cached("readings")
-        if cached is not None:
-            return cached
+        return await self._load_sheet("readings")
 
-        def _get():
-            sheet = self._get_spreadsheet().worksheet("Показания")
-            return sheet.get_all_records()
-
-        result = await self._run_sync(_get)
-        self._set_cached("readings", result)
-        return result
+    async def _get_readings_by_meter_id(self, meter_id: int) -> List[Dict]:
+        """Get a meter's readings in sheet order from the cached index."""
+        index = await self._get_index("readings", self._get_all_readings, "счетчик_id", grouped=True)
+        return index.get(str(meter_id), [])
 
     async def get_last_reading_for_meter(self, meter_id: int) -> Optional[Dict]:
         """Get last reading for a specific meter (uses cached readings)."""
-        all_readings = await self._get_all_readings()
-        matching = [
-            r for r in all_readings
-            if str(r.get("счетчик_id")) == str(meter_id)
-        ]
-        if matching:
-            return matching[-1]
-        return None
+        matching = await self._get_readings_by_meter_id(meter_id)
+        return matching[-1] if matching else None
 
     async def save_reading(
         self,
@@ -424,38 +789,45 @@ class SheetsService:
         telegram_id: int,
         tenant_name: str,
         reading: float,
-    ) -> int:
-        """Save a new reading and update meter's last reading."""
-        def _save():
-            sheet = self._get_spreadsheet().worksheet("Показания")
-            row = [
-                datetime.now().strftime("%Y-%m-%d %H:%M"),
-                meter_id,
-                meter_name,
-                premise_id,
-                premise_name,
-                telegram_id,
-                tenant_name,
-                reading,
-            ]
-            sheet.append_row(row)
-            return sheet.row_count
+    ) -> None:
+        """Save a new reading and update meter's last reading.
 
-        # Save to log
-        result = await self._run_sync(_save)
+        The log row and the meter's cells go out in one spreadsheets.batchUpdate call.
+        """
+        await self._ensure_fresh("meters")
+        meter = await self.get_meter(meter_id)
+        now = datetime.now(settings.tzinfo)
+        row = [
+            now.strftime("%Y-%m-%d %H:%M"),
+            meter_id,
+            meter_name,
+            premise_id,
+            premise_name,
+            telegram_id,
+            tenant_name,
+            reading,
+        ]
 
-        # Invalidate readings cache
+        def _resolve():
+            requests = [self._append_request("Показания", row)]
+            if meter is not None:
+                # Note: Расход к оплате and Сумма к оплате are formulas over these cells
+                requests += self._cell_requests("Счетчики", [(
+                    meter["_row"],
+                    ["Последнее показание", "Дата посл. показания"],
+                    [reading, now.strftime("%Y-%m-%d")],
+                )])
+            return requests
+
+        await self._write_requests(await self._run_sync(_resolve))
         self.invalidate_cache("readings")
-
-        # Update meter's last reading
-        await self.update_meter_last_reading(meter_id, reading)
-
-        return result
+        self.invalidate_cache("meters")
+        # Invoice sums are formulas over meter readings
+        self.invalidate_cache("invoices")
 
     async def get_readings_for_meter(self, meter_id: int) -> List[Dict]:
         """Get all readings for a meter (uses cached readings)."""
-        all_readings = await self._get_all_readings()
-        return [r for r in all_readings if str(r.get("счетчик_id")) == str(meter_id)]
+        return list(await self._get_readings_by_meter_id(meter_id))
 
     async def get_current_month_readings_for_meter(self, meter_id: int) -> List[Dict]:
         """Get readings for current month for a meter (uses cached readings)."""
@@ -469,47 +841,38 @@ class SheetsService:
     #          H=need_push, I=Дата последней оплаты, J=Выставить (чекбокс)
     # ============================================================
 
-    async def _get_all_invoices(self) -> List[Dict]:
-        """Get all invoices with row numbers (cached)."""
-        cached = self._get_cached("invoices")
-        if cached is not None:
-            return cached
+    def _parse_invoices(self, records: List[Dict]) -> List[Dict]:
+        """Add row numbers, normalize empty "Сумма" cells to 0 and parse need_push.
 
-        def _get():
-            sheet = self._get_spreadsheet().worksheet("Счета")
-            records = sheet.get_all_records()
-            result = []
-            for i, record in enumerate(records, start=2):
-                record["_row"] = i
-                result.append(record)
-            return result
+        The parsed flag goes to "_need_push", alongside the raw "need_push".
+        """
+        for i, record in enumerate(records, start=2):
+            record["_row"] = i
+            # Empty cells come back as "" - normalize once so callers can sum directly
+            record["Сумма"] = record.get("Сумма") or 0
+            record["_need_push"] = record.get("need_push") in (1, "1", True)
+        return records
 
-        result = await self._run_sync(_get)
-        self._set_cached("invoices", result)
-        return result
+    async def _get_all_invoices(self) -> List[Dict]:
+        """Get all invoices with row numbers (cached)."""
+        return await self._load_sheet("invoices")
 
     async def get_invoice_for_premise(self, premise_id: int) -> Optional[Dict]:
         """Get current invoice for a premise (uses cached invoices)."""
-        invoices = await self._get_all_invoices()
-        for record in invoices:
-            if str(record.get("помещение_id")) == str(premise_id):
-                return record
-        return None
+        index = await self._get_index("invoices", self._get_all_invoices, "помещение_id")
+        return index.get(str(premise_id))
 
     async def get_invoices_for_tenant(self, telegram_id: int) -> List[Dict]:
         """Get all invoices where tenant is responsible for payment (uses cached invoices)."""
-        invoices = await self._get_all_invoices()
-        return [
-            r for r in invoices
-            if str(r.get("ответственный_оплата")) == str(telegram_id)
-        ]
+        index = await self._get_index("invoices", self._get_all_invoices, "ответственный_оплата", grouped=True)
+        return index.get(str(telegram_id), [])
 
     async def get_unpaid_invoices_for_tenant(self, telegram_id: int) -> List[Dict]:
         """Get unpaid invoices for a tenant (only with status 'Не оплачен')."""
         invoices = await self.get_invoices_for_tenant(telegram_id)
         return [
             inv for inv in invoices
-            if inv.get("Статус") == "Не оплачен" and (inv.get("Сумма", 0) or 0) > 0
+            if inv.get("Статус") == "Не оплачен" and inv["Сумма"] > 0
         ]
 
     async def get_all_unpaid_invoices(self) -> List[Dict]:
@@ -517,7 +880,7 @@ class SheetsService:
         invoices = await self._get_all_invoices()
         return [
             r for r in invoices
-            if r.get("Статус") == "Не оплачен" and (r.get("Сумма", 0) or 0) > 0
+            if r.get("Статус") == "Не оплачен" and r["Сумма"] > 0
         ]
 
     async def get_draft_invoices(self) -> List[Dict]:
@@ -525,7 +888,7 @@ class SheetsService:
         invoices = await self._get_all_invoices()
         return [
             r for r in invoices
-            if r.get("Статус") == "Черновик" and (r.get("Сумма", 0) or 0) > 0
+            if r.get("Статус") == "Черновик" and r["Сумма"] > 0
         ]
 
     async def issue_invoice(self, premise_id: int) -> bool:
@@ -534,108 +897,98 @@ class SheetsService:
         Note: Does NOT set need_push flag because notification is sent
         immediately by the bot in issue_invoice_callback.
         """
-        def _issue():
-            sheet = self._get_spreadsheet().worksheet("Счета")
-            records = sheet.get_all_records()
-            for i, record in enumerate(records, start=2):
-                if str(record.get("помещение_id")) == str(premise_id):
-                    current_amount = record.get("Сумма", 0) or 0
-                    col_idx = self._get_col_index(sheet, "Выставленная сумма")
-                    sheet.update_cell(i, col_idx, current_amount)
-                    return True
+        await self._ensure_fresh("invoices")
+        invoice = await self.get_invoice_for_premise(premise_id)
+        if invoice is None:
             return False
 
-        result = await self._run_sync(_issue)
-        if result:
-            self.invalidate_cache("invoices")
-        return result
+        writes = await self._run_sync(
+            self._cell_requests, "Счета", [(invoice["_row"], ["Выставленная сумма"], [invoice["Сумма"]])]
+        )
+        await self._write_requests(writes)
+        self.invalidate_cache("invoices")
+        return True
 
     async def update_invoice_amount(self, premise_id: int) -> None:
         """Recalculate invoice amount from meters for a premise."""
-        def _update():
-            # Get all meters for this premise
-            meters_sheet = self._get_spreadsheet().worksheet("Счетчики")
-            meters = meters_sheet.get_all_records()
-
-            total = 0
-            responsible_id = None
-            responsible_name = ""
-            premise_name = ""
-
-            for meter in meters:
-                if str(meter.get("помещение_id")) == str(premise_id):
-                    total += meter.get("Сумма к оплате", 0) or 0
-                    if not responsible_id:
-                        responsible_id = meter.get("ответственный_оплата")
-                        responsible_name = meter.get("Имя_оплата", "")
-                        premise_name = meter.get("Помещение", "")
-
-            # Update or create invoice
-            invoices_sheet = self._get_spreadsheet().worksheet("Счета")
-            records = invoices_sheet.get_all_records()
-
-            found = False
-            for i, record in enumerate(records, start=2):
-                if str(record.get("помещение_id")) == str(premise_id):
-                    col_idx = self._get_col_index(invoices_sheet, "Сумма")
-                    invoices_sheet.update_cell(i, col_idx, total)
-                    found = True
-                    break
+        await self._ensure_fresh("meters", "invoices")
+        meters, invoice = await asyncio.gather(
+            self.get_meters_by_premise(premise_id),
+            self.get_invoice_for_premise(premise_id),
+        )
 
-            if not found and total > 0:
-                invoices_sheet.append_row([
-                    premise_id,
-                    premise_name,
-                    responsible_id,
-                    responsible_name,
-                    total,
-                    "Не оплачен",
-                    "",
-                ])
+        total = 0
+        responsible_id = None
+        responsible_name = ""
+        premise_name = ""
 
-        await self._run_sync(_update)
+        for meter in meters:
+            total += meter.get("Сумма к оплате", 0) or 0
+            if not responsible_id:
+                responsible_id = meter.get("ответственный_оплата")
+                responsible_name = meter.get("Имя_оплата", "")
+                premise_name = meter.get("Помещение", "")
+
+        # Update or create invoice
+        if invoice is not None:
+            writes = await self._run_sync(self._cell_requests, "Счета", [(invoice["_row"], ["Сумма"], [total])])
+            await self._write_requests(writes)
+        elif total > 0:
+            request = await self._run_sync(self._append_request, "Счета", [
+                premise_id,
+                premise_name,
+                responsible_id,
+                responsible_name,
+                total,
+                "Не оплачен",
+                "",
+            ])
+            await self._write_requests([request])
         self.invalidate_cache("invoices")
 
+    def _invoice_paid_cells(self, invoice: Dict, today: str) -> List[Tuple[int, List[str], List[Any]]]:
+        """Cells that mark an invoice as paid (for _cell_requests)."""
+        return [
+            (invoice["_row"], ["Выставленная сумма"], [0]),
+            (invoice["_row"], ["Дата последней оплаты"], [today]),
+        ]
+
     async def mark_invoice_paid(self, premise_id: int) -> None:
         """Mark invoice as paid: zero out Выставленная сумма, update date."""
-        def _mark():
-            sheet = self._get_spreadsheet().worksheet("Счета")
-            records = sheet.get_all_records()
-            for i, record in enumerate(records, start=2):
-                if str(record.get("помещение_id")) == str(premise_id):
-                    # Set Выставленная сумма to 0
-                    range1 = self._get_range_by_names(sheet, i, ["Выставленная сумма"])
-                    sheet.update(range1, [[0]])
-                    # Update Дата последней оплаты
-                    range2 = self._get_range_by_names(sheet, i, ["Дата последней оплаты"])
-                    sheet.update(range2, [[datetime.now().strftime("%Y-%m-%d")]])
-                    break
-
-        await self._run_sync(_mark)
+        await self._ensure_fresh("invoices")
+        invoice = await self.get_invoice_for_premise(premise_id)
+        if invoice is None:
+            return
+
+        today = datetime.now(settings.tzinfo).strftime("%Y-%m-%d")
+        writes = await self._run_sync(self._cell_requests, "Счета", self._invoice_paid_cells(invoice, today))
+        await self._write_requests(writes)
         self.invalidate_cache("invoices")
 
     async def get_invoices_needing_push(self) -> List[Dict]:
         """Get all invoices where need_push = 1 (uses cached invoices)."""
         invoices = await self._get_all_invoices()
-        result = []
-        for record in invoices:
-            need_push = record.get("need_push", 0)
-            if need_push == 1 or need_push == "1" or need_push is True:
-                result.append(record)
-        return result
+        return [record for record in invoices if record["_need_push"]]
 
     async def clear_need_push(self, premise_id: int) -> None:
         """Clear need_push flag after sending notification."""
-        def _clear():
-            sheet = self._get_spreadsheet().worksheet("Счета")
-            records = sheet.get_all_records()
-            for i, record in enumerate(records, start=2):
-                if str(record.get("помещение_id")) == str(premise_id):
-                    col_idx = self._get_col_index(sheet, "need_push")
-                    sheet.update_cell(i, col_idx, 0)
-                    break
+        await self.clear_need_push_bulk([premise_id])
 
-        await self._run_sync(_clear)
+    async def clear_need_push_bulk(self, premise_ids: List[int]) -> None:
+        """Clear need_push flags for several premises in one batch update."""
+        await self._ensure_fresh("invoices")
+        targets = {str(pid) for pid in premise_ids}
+        invoices = await self._get_all_invoices()
+        cells = [
+            (inv["_row"], ["need_push"], [0])
+            for inv in invoices
+            if str(inv.get("помещение_id")) in targets
+        ]
+        if not cells:
+            return
+
+        writes = await self._run_sync(self._cell_requests, "Счета", cells)
+        await self._write_requests(writes)
         self.invalidate_cache("invoices")
 
     # ============================================================
@@ -654,18 +1007,28 @@ class SheetsService:
         receipt_url: str,
     ) -> None:
         """Save payment record to log."""
-        def _save():
-            sheet = self._get_spreadsheet().worksheet("Оплаты")
-            sheet.append_row([
-                datetime.now().strftime("%Y-%m-%d %H:%M"),
-                premise_id,
-                premise_name,
-                telegram_id,
-                tenant_name,
-                amount,
-                receipt_url,
-            ])
-        return await self._run_sync(_save)
+        row = self._payment_row(premise_id, premise_name, telegram_id, tenant_name, amount, receipt_url)
+        await self._write_requests([await self._run_sync(self._append_request, "Оплаты", row)])
+
+    def _payment_row(
+        self,
+        premise_id: int,
+        premise_name: str,
+        telegram_id: int,
+        tenant_name: str,
+        amount: float,
+        receipt_url: str,
+    ) -> List[Any]:
+        """Row for the Оплаты log."""
+        return [
+            datetime.now(settings.tzinfo).strftime("%Y-%m-%d %H:%M"),
+            premise_id,
+            premise_name,
+            telegram_id,
+            tenant_name,
+            amount,
+            receipt_url,
+        ]
 
     async def process_payment(
         self,
@@ -682,65 +1045,45 @@ class SheetsService:
         2. Save payment log
         3. Update invoice status (NOT the amount - it's a formula)
 
-        Optimized: batch updates all meters in single API call instead of N calls.
+        Rows are located from the cached meters and invoices; the log row
+        and the meter and invoice updates go out in one batchUpdate call.
         """
-        def _mark_meters_paid():
-            sheet = self._get_spreadsheet().worksheet("Счетчики")
-            records = sheet.get_all_records()
-            today = datetime.now().strftime("%Y-%m-%d")
-
-            # Collect all updates for this premise
-            updates = []
-            for i, record in enumerate(records, start=2):
-                if str(record.get("помещение_id")) == str(premise_id):
-                    last_reading = record.get("Последнее показание", 0) or 0
-                    range_addr = self._get_range_by_names(
-                        sheet, i, ["Оплаченное показание", "Дата посл. оплаты"]
-                    )
-                    updates.append({
-                        "range": range_addr,
-                        "values": [[last_reading, today]]
-                    })
-
-            # Batch update all meters at once
-            if updates:
-                sheet.batch_update(updates)
-
-        await self._run_sync(_mark_meters_paid)
-        self.invalidate_cache("meters")
-
-        # Save payment log
-        await self.save_payment(
-            premise_id=premise_id,
-            premise_name=premise_name,
-            telegram_id=telegram_id,
-            tenant_name=tenant_name,
-            amount=amount,
-            receipt_url=receipt_url,
+        await self._ensure_fresh("meters", "invoices")
+        meters, invoice = await asyncio.gather(
+            self.get_meters_by_premise(premise_id),
+            self.get_invoice_for_premise(premise_id),
         )
+        today = datetime.now(settings.tzinfo).strftime("%Y-%m-%d")
 
-        # Update invoice status only (don't touch Сумма - it's a formula)
-        await self.mark_invoice_paid(premise_id)
+        def _resolve():
+            writes = self._cell_requests("Счетчики", [
+                (m["_row"], ["Оплаченное показание", "Дата посл. оплаты"], [m.get("Последнее показание", 0) or 0, today])
+                for m in meters
+            ])
+            # Invoice status only (don't touch Сумма - it's a formula)
+            if invoice is not None:
+                writes += self._cell_requests("Счета", self._invoice_paid_cells(invoice, today))
+            writes.append(self._append_request("Оплаты", self._payment_row(
+                premise_id, premise_name, telegram_id, tenant_name, amount, receipt_url,
+            )))
+            return writes
+
+        await self._write_requests(await self._run_sync(_resolve))
+        self.invalidate_cache("meters")
+        self.invalidate_cache("invoices")
 
     # ============================================================
     # Настройки
     # Columns: Ключ, Значение
     # ============================================================
 
+    def _parse_settings(self, records: List[Dict]) -> Dict[str, str]:
+        """Turn Ключ/Значение rows into a dict."""
+        return {r.get("Ключ"): r.get("Значение") for r in records if r.get("Ключ")}
+
     async def _get_all_settings(self) -> Dict[str, str]:
         """Get all settings as a dict (cached)."""
-        cached = self._get_cached("settings")
-        if cached is not None:
-            return cached
-
-        def _get():
-            sheet = self._get_spreadsheet().worksheet("Настройки")
-            records = sheet.get_all_records()
-            return {r.get("Ключ"): r.get("Значение") for r in records if r.get("Ключ")}
-
-        result = await self._run_sync(_get)
-        self._set_cached("settings", result)
-        return result
+        return await self._load_sheet("settings")
 
     async def get_setting(self, key: str) -> Optional[str]:
         """Get setting value by key (uses cached settings)."""
@@ -764,27 +1107,20 @@ class SheetsService:
     # Columns: Тип, Тариф
     # ============================================================
 
+    def _parse_tariffs(self, records: List[Dict]) -> List[Dict]:
+        """Keep type and value of each tariff, with row numbers."""
+        return [
+            {
+                "_row": i,
+                "Тип": record.get("Тип", ""),
+                "Тариф": record.get("Тариф", 0) or 0,
+            }
+            for i, record in enumerate(records, start=2)
+        ]
+
     async def get_tariffs(self) -> List[Dict]:
         """Get all tariffs from Тарифы sheet (cached)."""
-        cached = self._get_cached("tariffs")
-        if cached is not None:
-            return cached
-
-        def _get():
-            sheet = self._get_spreadsheet().worksheet("Тарифы")
-            records = sheet.get_all_records()
-            result = []
-            for i, record in enumerate(records, start=2):
-                result.append({
-                    "_row": i,
-                    "Тип": record.get("Тип", ""),
-                    "Тариф": record.get("Тариф", 0) or 0,
-                })
-            return result
-
-        result = await self._run_sync(_get)
-        self._set_cached("tariffs", result)
-        return result
+        return await self._load_sheet("tariffs")
 
     async def get_tariff_by_type(self, tariff_type: str) -> Optional[Dict]:
         """Get tariff by type name (uses cached tariffs)."""
@@ -796,20 +1132,18 @@ class SheetsService:
 
     async def update_tariff(self, tariff_type: str, new_value: float) -> bool:
         """Update tariff value by type name."""
-        def _update():
-            sheet = self._get_spreadsheet().worksheet("Тарифы")
-            records = sheet.get_all_records()
-            for i, record in enumerate(records, start=2):
-                if record.get("Тип") == tariff_type:
-                    col_idx = self._get_col_index(sheet, "Тариф")
-                    sheet.update_cell(i, col_idx, new_value)
-                    return True
+        await self._ensure_fresh("tariffs")
+        tariff = await self.get_tariff_by_type(tariff_type)
+        if tariff is None:
             return False
 
-        result = await self._run_sync(_update)
-        if result:
-            self.invalidate_cache("tariffs")
-        return result
+        writes = await self._run_sync(self._cell_requests, "Тарифы", [(tariff["_row"], ["Тариф"], [new_value])])
+        await self._write_requests(writes)
+        self.invalidate_cache("tariffs")
+        # Meter and invoice sums are formulas over tariffs
+        self.invalidate_cache("meters")
+        self.invalidate_cache("invoices")
+        return True
 
     # ============================================================
     # Агрегация для статусов
@@ -819,35 +1153,31 @@ class SheetsService:
         """Get map of meter_id -> readings for current month (cached).
 
         Used by both get_readings_status and get_tenants_without_readings
-        to avoid duplicate API calls.
+        to avoid duplicate API calls. Readings are grouped by month once per
+        load, so the month rollover needs no new cache entry. The current
+        month is taken in settings.tzinfo, like the scheduler's reminder days.
         """
-        cache_key = f"readings_map_{datetime.now().strftime('%Y-%m')}"
-        cached = self._get_cached(cache_key)
-        if cached is not None:
-            return cached
-
-        all_readings = await self._get_all_readings()
-        current_month = datetime.now().strftime("%Y-%m")
-
-        # Group readings by meter_id for current month
-        readings_by_meter: Dict[str, List[Dict]] = {}
-        for r in all_readings:
-            if str(r.get("Дата", "")).startswith(current_month):
+        def _build(readings):
+            # Month ("YYYY-MM" prefix of Дата) -> meter_id -> readings
+            index: Dict[str, Dict[str, List[Dict]]] = {}
+            for r in readings:
+                month = str(r.get("Дата", ""))[:7]
                 meter_id = str(r.get("счетчик_id", ""))
-                if meter_id not in readings_by_meter:
-                    readings_by_meter[meter_id] = []
-                readings_by_meter[meter_id].append(r)
+                index.setdefault(month, {}).setdefault(meter_id, []).append(r)
+            return index
 
-        self._set_cached(cache_key, readings_by_meter)
-        return readings_by_meter
+        index = await self._get_derived("readings_by_month", self._get_all_readings, _build)
+        return index.get(datetime.now(settings.tzinfo).strftime("%Y-%m"), {})
 
     async def get_readings_status(self) -> List[Dict]:
         """Get readings status for all meters (who submitted this month).
 
         Fully cached: uses cached meters and cached readings map.
         """
-        meters = await self.get_all_meters()
-        readings_by_meter = await self._get_current_month_meter_readings_map()
+        meters, readings_by_meter = await asyncio.gather(
+            self.get_all_meters(),
+            self._get_current_month_meter_readings_map(),
+        )
 
         result = []
         for meter in meters:
@@ -860,28 +1190,59 @@ class SheetsService:
             })
         return result
 
+    async def get_readings_status_page(self, offset: int, limit: int) -> Tuple[int, int, List[Dict]]:
+        """Get one page of readings status.
+
+        Returns (total meters, meters with readings, page items). Items have the
+        same shape as in get_readings_status. An offset past the end is clamped
+        to the last page.
+        """
+        meters, readings_by_meter = await asyncio.gather(
+            self.get_all_meters(),
+            self._get_current_month_meter_readings_map(),
+        )
+
+        total = len(meters)
+        submitted = sum(1 for m in meters if str(m.get("id", "")) in readings_by_meter)
+        if total:
+            offset = min(offset, (total - 1) // limit * limit)
+
+        page_items = []
+        for meter in meters[offset:offset + limit]:
+            meter_readings = readings_by_meter.get(str(meter.get("id", "")), [])
+            page_items.append({
+                "meter": meter,
+                "has_readings": len(meter_readings) > 0,
+                "readings_count": len(meter_readings),
+            })
+        return total, submitted, page_items
+
     async def get_tenants_without_readings(self) -> List[Dict]:
         """Get list of tenants who haven't submitted readings this month.
 
         Fully cached: uses cached meters and cached readings map.
         """
-        meters = await self.get_all_meters()
-        readings_by_meter = await self._get_current_month_meter_readings_map()
+        meters, readings_by_meter = await asyncio.gather(
+            self.get_all_meters(),
+            self._get_current_month_meter_readings_map(),
+        )
 
         # Find tenants with meters without readings
         tenants_to_remind = {}
         for meter in meters:
-            meter_id = str(meter.get("id", ""))
-            if meter_id not in readings_by_meter:
-                tid = meter.get("ответственный_показания")
-                if tid and tid not in tenants_to_remind:
-                    tenants_to_remind[tid] = {
-                        "telegram_id": tid,
-                        "name": meter.get("Имя_показания", ""),
-                        "meters": []
-                    }
-                if tid:
-                    tenants_to_remind[tid]["meters"].append(meter.get("Название", ""))
+            if str(meter.get("id", "")) in readings_by_meter:
+                continue
+            tid = meter.get("ответственный_показания")
+            if not tid:
+                continue
+            tenant = tenants_to_remind.get(tid)
+            if tenant is None:
+                tenant = tenants_to_remind[tid] = {
+                    "telegram_id": tid,
+                    "name": meter.get("Имя_показания", ""),
+                    "meters": []
+                }
+            tenant["meters"].append(meter.get("Название", ""))
 
         return list(tenants_to_remind.values())
 
@@ -900,7 +1261,7 @@ class SheetsService:
                     "premises": []
                 }
             if tid:
-                tenants_map[tid]["total"] += inv.get("Сумма", 0) or 0
+                tenants_map[tid]["total"] += inv["Сумма"]
                 tenants_map[tid]["premises"].append(inv.get("Помещение", ""))
 
         return list(tenants_map.values())
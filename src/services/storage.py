@@ -1,18 +1,41 @@
 import asyncio
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from functools import partial
+from typing import BinaryIO, Optional, Tuple
 
 import boto3
 from botocore.config import Config
 
 from src.config import settings
 
+# Largest receipt photo accepted for upload
+MAX_RECEIPT_BYTES = 10 * 1024 * 1024
+
 
 class StorageService:
     """Service for uploading files to Cloudflare R2 (S3-compatible)."""
 
+    # Max remembered (telegram_id, file_unique_id) -> receipt URL entries
+    MAX_UPLOADED_RECEIPTS = 1024
+    # Pre-signed receipt URL lifetime (7 days, the SigV4 maximum), and how long
+    # one is reused (1 day, so handed-out links stay valid for at least 6 days)
+    RECEIPT_URL_EXPIRES_IN = 7 * 24 * 3600
+    RECEIPT_URL_REUSE_TTL = 24 * 3600
+    MAX_RECEIPT_URLS = 1024
+    # Max uploads in flight; each holds one worker thread and one connection
+    MAX_CONCURRENT_UPLOADS = 16
+
     def __init__(self):
         self._client = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.MAX_CONCURRENT_UPLOADS, thread_name_prefix="storage"
+        )
+        self._uploaded_receipts: "OrderedDict[Tuple[int, str], str]" = OrderedDict()
+        # Receipt key -> (signing time, pre-signed URL)
+        self._receipt_urls: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
 
     def _get_client(self):
         if self._client is None:
@@ -21,31 +44,59 @@ class StorageService:
                 endpoint_url=settings.r2_endpoint_url,
                 aws_access_key_id=settings.r2_access_key_id,
                 aws_secret_access_key=settings.r2_secret_access_key,
-                config=Config(signature_version="s3v4"),
+                config=Config(
+                    signature_version="s3v4",
+                    # One kept-alive connection per upload thread
+                    max_pool_connections=self.MAX_CONCURRENT_UPLOADS,
+                    connect_timeout=5,
+                    read_timeout=30,
+                    retries={"max_attempts": 3, "mode": "standard"},
+                    tcp_keepalive=True,
+                ),
             )
         return self._client
 
+    async def warm_up(self) -> None:
+        """Create the client up front so the first upload doesn't wait for it.
+
+        Loading botocore's service models takes a noticeable moment.
+        """
+        await self._run_sync(self._get_client)
+
     async def _run_sync(self, func, *args, **kwargs):
-        """Run synchronous boto3 calls in executor."""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, partial(func, *args, **kwargs))
+        """Run synchronous boto3 calls in the service's executor.
+
+        A dedicated pool keeps slow uploads from starving other users of
+        the loop's default executor.
+        """
+        loop = asyncio.get_running_loop()
+        if kwargs:
+            func = partial(func, **kwargs)
+        return await loop.run_in_executor(self._executor, func, *args)
 
     async def upload_receipt(
         self,
-        file_bytes: bytes,
+        fileobj: BinaryIO,
         telegram_id: int,
         file_id: str,
+        file_unique_id: Optional[str] = None,
     ) -> str:
-        """Upload receipt photo to R2 and return pre-signed URL."""
+        """Upload receipt photo from a binary file object to R2 and return its URL.
+
+        When file_unique_id is given, the URL is remembered so that
+        get_uploaded_receipt can skip re-uploading the same photo.
+        """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        key = f"receipts/{telegram_id}/{timestamp}_{file_id[:8]}.jpg"
+        # file_id prefixes are shared by most photos; file_unique_id tells them apart
+        suffix = file_unique_id or file_id[-8:]
+        key = f"receipts/{telegram_id}/{timestamp}_{suffix}.jpg"
 
         def _upload():
             client = self._get_client()
             client.put_object(
                 Bucket=settings.r2_bucket_name,
                 Key=key,
-                Body=file_bytes,
+                Body=fileobj,
                 ContentType="image/jpeg",
             )
             # Use public URL if configured, otherwise return key for reference
@@ -53,18 +104,43 @@ class StorageService:
                 return f"{settings.r2_public_url}/{key}"
             return f"r2://{settings.r2_bucket_name}/{key}"
 
-        return await self._run_sync(_upload)
+        url = await self._run_sync(_upload)
+        if file_unique_id:
+            self._uploaded_receipts[(telegram_id, file_unique_id)] = url
+            if len(self._uploaded_receipts) > self.MAX_UPLOADED_RECEIPTS:
+                self._uploaded_receipts.popitem(last=False)
+        return url
+
+    def get_uploaded_receipt(self, telegram_id: int, file_unique_id: str) -> Optional[str]:
+        """Return the URL of a photo this user already uploaded, if remembered."""
+        url = self._uploaded_receipts.get((telegram_id, file_unique_id))
+        if url is not None:
+            self._uploaded_receipts.move_to_end((telegram_id, file_unique_id))
+        return url
 
     async def get_receipt_url(self, key: str) -> str:
-        """Generate a fresh pre-signed URL for an existing receipt."""
+        """Get a pre-signed URL for an existing receipt.
+
+        URLs are reused for RECEIPT_URL_REUSE_TTL, so repeated lookups skip signing.
+        """
+        cached = self._receipt_urls.get(key)
+        if cached is not None and time.time() - cached[0] < self.RECEIPT_URL_REUSE_TTL:
+            self._receipt_urls.move_to_end(key)
+            return cached[1]
+
         def _get_url():
             client = self._get_client()
             return client.generate_presigned_url(
                 "get_object",
                 Params={"Bucket": settings.r2_bucket_name, "Key": key},
-                ExpiresIn=15768000,
+                ExpiresIn=self.RECEIPT_URL_EXPIRES_IN,
             )
-        return await self._run_sync(_get_url)
+        url = await self._run_sync(_get_url)
+        self._receipt_urls[key] = (time.time(), url)
+        self._receipt_urls.move_to_end(key)
+        if len(self._receipt_urls) > self.MAX_RECEIPT_URLS:
+            self._receipt_urls.popitem(last=False)
+        return url
 
 
 storage_service = StorageService()